@@ -1,3 +1,4 @@
+from asgiref.sync import iscoroutinefunction
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import redirect
 
@@ -6,10 +7,21 @@ def redirect_authenticated_user(view_func):
     """
     Decorator to redirect authenticated users to the home page.
     """
+    if iscoroutinefunction(view_func):
+        async def _wrapped_view(request: HttpRequest, *args, **kwargs):
+            # Resolve the user through the async ORM so templates can read it without a sync query
+            request.user = await request.auser()
+            if request.user.is_authenticated:
+                return redirect('home')
+
+            return await view_func(request, *args, **kwargs)
+
+        return _wrapped_view
+
     def _wrapped_view(request: HttpRequest, *args, **kwargs):
         if request.user.is_authenticated:
             return redirect('home')
         
         return view_func(request, *args, **kwargs)
     
-    return _wrapped_view
\ No newline at end of file
+    return _wrapped_view
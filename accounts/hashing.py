@@ -0,0 +1,57 @@
+"""
+Password hashing for the async auth views, off the event loop.
+
+PBKDF2 is deliberately slow and releases the GIL while it runs, so hashes are
+computed on a small thread pool. Its size caps how many cores a burst of
+sign-ins can take; further requests wait their turn without blocking the
+event loop or the requests that don't hash. Sign-ins go through
+``django.contrib.auth.aauthenticate`` and ``HashingPoolBackend``, so other
+backends and the ``user_login_failed`` signal keep working.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache, partial
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password, identify_hasher, make_password
+
+from accounts.models import User
+
+
+@cache
+def hashing_pool() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=settings.PASSWORD_HASHING_WORKERS, thread_name_prefix='password-hashing')
+
+
+async def _in_pool(function, *args):
+    return await asyncio.get_running_loop().run_in_executor(hashing_pool(), partial(function, *args))
+
+
+async def amake_password(raw_password: str) -> str:
+    return await _in_pool(make_password, raw_password)
+
+
+class HashingPoolBackend(ModelBackend):
+    """
+    ``ModelBackend`` whose async sign-in checks the password on the hashing pool.
+    """
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = await User._default_manager.aget_by_natural_key(username)
+        except User.DoesNotExist:
+            # Hash anyway, so a missing account takes as long to reject as a wrong password
+            await amake_password(password)
+            return None
+        if not await _in_pool(check_password, password, user.password) or not self.user_can_authenticate(user):
+            return None
+
+        if identify_hasher(user.password).must_update(user.password):
+            user.password = await amake_password(password)
+            await user.asave(update_fields=['password'])
+        return user
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from accounts.tasks import purge_expired_rows
+
+
+class Command(BaseCommand):
+    help = "Delete expired pending sign-ups and password reset tokens, for when Celery beat isn't running."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per DELETE.")
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_rows(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {deleted['pending_users']} pending users and {deleted['tokens']} tokens."
+        ))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 07:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_token"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="pendinguser",
+            index=models.Index(
+                fields=["created_at"], name="pendinguser_created_at_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="token",
+            index=models.Index(fields=["created_at"], name="token_created_at_idx"),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-18 07:30
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def hash_tokens(apps, schema_editor):
+    Token = apps.get_model("accounts", "Token")
+    for token in Token.objects.only("id", "token").iterator():
+        token.token = hashlib.sha256(token.token.encode()).hexdigest()
+        token.save(update_fields=["token"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0003_created_at_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(hash_tokens, migrations.RunPython.noop),
+        migrations.RenameField(
+            model_name="token",
+            old_name="token",
+            new_name="digest",
+        ),
+        migrations.AlterField(
+            model_name="token",
+            name="digest",
+            field=models.CharField(max_length=64, unique=True),
+        ),
+    ]
@@ -1,9 +1,13 @@
+import hashlib
 import uuid
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from accounts.manager import UserManager
 from common.models import BaseModel
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+
+# Pending sign-ups and reset tokens stop working this long after they are issued
+EXPIRY = timedelta(minutes=20)
 
 
 # Create your models here.
@@ -11,6 +15,29 @@ class TokenType(models.TextChoices):
     PASSWORD_RESET = ('PASSWORD_RESET')
 
 
+class ExpiringQuerySet(models.QuerySet):
+    def live(self):
+        """
+        Rows issued within ``EXPIRY``; expired rows are never loaded.
+        """
+        return self.filter(created_at__gte=datetime.now(timezone.utc) - EXPIRY)
+
+    def expired(self):
+        return self.filter(created_at__lt=datetime.now(timezone.utc) - EXPIRY)
+
+    def purge_expired(self, batch_size: int = 1000) -> int:
+        """
+        Delete expired rows a batch at a time, so no single statement holds a long lock.
+        Returns the number of rows deleted.
+        """
+        deleted = 0
+        while True:
+            batch = list(self.expired().order_by('created_at').values_list('pk', flat=True)[:batch_size])
+            if not batch:
+                return deleted
+            deleted += self.model.objects.filter(pk__in=batch).delete()[0]
+
+
 class User(BaseModel, AbstractBaseUser, PermissionsMixin):
     email = models.EmailField(unique=True)
     password = models.CharField(max_length=128)
@@ -27,44 +54,52 @@ class PendingUser(BaseModel):
     verification_code = models.CharField(max_length=64, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = ExpiringQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='pendinguser_created_at_idx'),
+        ]
 
     def is_valid(self) -> bool:
         """
         Check if the pending user is still valid based on the verification code.
         """
-
-        lifespan = 20 * 60  # 20 minutes in seconds
-        now = datetime.now(timezone.utc)
-        timediff = (now - self.created_at).total_seconds()
-        if timediff > lifespan:
-            return False
-        return True
+        return datetime.now(timezone.utc) - self.created_at <= EXPIRY
     
 
 class Token(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
-    token = models.CharField(max_length=255)
+    # Only a digest is stored; the raw token exists in the emailed link alone
+    digest = models.CharField(max_length=64, unique=True)
     token_type = models.CharField(max_length=100, choices=TokenType.choices)
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = ExpiringQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='token_created_at_idx'),
+        ]
+
     def __str__(self):
-        return f"{self.user} {self.token}"
+        return f"{self.user} {self.token_type}"
+
+    @staticmethod
+    def digest_for(raw_token: str) -> str:
+        """ The stored form of a raw token.
+        """
+        return hashlib.sha256(raw_token.encode()).hexdigest()
     
     def is_valid(self) -> bool:
         """ Check if the token is still valid based on its creation time.
         """
-        lifespan = 20 * 60  # 20 minutes in seconds
-        now = datetime.now(timezone.utc)
-        timediff = (now - self.created_at).total_seconds()
-        if timediff > lifespan:
-            return False
-        return True
+        return datetime.now(timezone.utc) - self.created_at <= EXPIRY
     
-    def reset_user_password(self, raw_password: str):
-        """ Reset the user's password using the token.
+    def consume(self) -> bool:
+        """ Delete the token in a single statement. Returns False when a
+        concurrent request already used it.
         """
-        self.user: User
-        self.user.set_password(raw_password)
-        self.user.save()
+        return Token.objects.filter(pk=self.pk).delete()[0] == 1
@@ -0,0 +1,17 @@
+from celery import shared_task
+
+from accounts.models import PendingUser, Token
+
+
+@shared_task
+def purge_expired_rows(batch_size: int = 1000) -> dict[str, int]:
+    """
+    Delete expired pending sign-ups and reset tokens.
+
+    Scheduled by Celery beat through ``CELERY_BEAT_SCHEDULE``; run
+    ``manage.py purge_expired_rows`` instead where beat isn't running.
+    """
+    return {
+        'pending_users': PendingUser.objects.purge_expired(batch_size),
+        'tokens': Token.objects.purge_expired(batch_size),
+    }
@@ -0,0 +1,44 @@
+import io
+from datetime import datetime, timedelta, timezone
+
+from django.core.management import call_command
+from django.test.client import Client
+from django.urls import reverse
+
+from accounts.models import EXPIRY, PendingUser, Token, TokenType, User
+from accounts.tests.factories import UserFactory
+
+
+def expire(queryset):
+    queryset.update(created_at=datetime.now(timezone.utc) - EXPIRY - timedelta(seconds=1))
+
+
+def test_verify_account_expired_code(db, client: Client):
+    """
+    Test that an expired verification code is rejected.
+    """
+    PendingUser.objects.create(email="late@example.com", verification_code="testcode", password="testpassword")
+    expire(PendingUser.objects.all())
+
+    response = client.post(reverse('verify_account'), {'code': "testcode", 'email': "late@example.com"})
+    assert response.status_code == 400
+    assert User.objects.count() == 0
+
+
+def test_purge_expired_rows_command(db):
+    """
+    Test that the command deletes only expired pending users and tokens, in batches.
+    """
+    for number in range(5):
+        PendingUser.objects.create(email=f"pending{number}@example.com", verification_code=f"code{number}")
+    users = UserFactory.create_batch(3)
+    for user in users:
+        Token.objects.create(user=user, digest=Token.digest_for(f"token-{user.pk}"), token_type=TokenType.PASSWORD_RESET)
+    expire(PendingUser.objects.exclude(email="pending0@example.com"))
+    expire(Token.objects.exclude(user=users[0]))
+
+    out = io.StringIO()
+    call_command('purge_expired_rows', batch_size=2, stdout=out)
+    assert "Deleted 4 pending users and 2 tokens." in out.getvalue()
+    assert list(PendingUser.objects.values_list('email', flat=True)) == ["pending0@example.com"]
+    assert list(Token.objects.values_list('user', flat=True)) == [users[0].pk]
@@ -3,8 +3,11 @@ from django.test.client import Client
 from accounts.models import PendingUser, User, Token, TokenType
 from django.contrib.auth.hashers import check_password
 from django.contrib.messages import get_messages
-from django.contrib.auth import get_user
+from django.contrib.auth import BACKEND_SESSION_KEY, get_user
+from django.contrib.auth.signals import user_login_failed
 from datetime import datetime, timezone
+import re
+from unittest import mock
 
 from conftest import auth_user_password
 
@@ -174,10 +177,10 @@ def test_verify_password_reset_link_valid_token(db, client: Client, user_instanc
     """
     url = reverse('set_new_password')
     # Create a token for the user
-    reset_token = Token.objects.create(
+    Token.objects.create(
         user=user_instance,
         token_type=TokenType.PASSWORD_RESET,
-        token="validtoken",
+        digest=Token.digest_for("validtoken"),
         created_at=datetime.now(timezone.utc)
 
     )
@@ -185,7 +188,7 @@ def test_verify_password_reset_link_valid_token(db, client: Client, user_instanc
         'password1': 'newpassword123',
         'password2': 'newpassword123',
         'email': user_instance.email,
-        'token': reset_token.token,
+        'token': "validtoken",
     }
 
     response = client.post(url, request_data)
@@ -212,7 +215,7 @@ def test_verify_password_reset_link_invalid_token(db, client: Client, user_insta
     reset_token = Token.objects.create(
         user=user_instance,
         token_type=TokenType.PASSWORD_RESET,
-        token="validtoken",
+        digest=Token.digest_for("validtoken"),
         created_at=datetime.now(timezone.utc)
      )
 
@@ -232,3 +235,139 @@ def test_verify_password_reset_link_invalid_token(db, client: Client, user_insta
     assert len(messages) == 1
     assert messages[0].level_tag == "error"
     assert "Invalid or expired password reset link." in str(messages[0])
+
+
+def test_register_user_sends_email_after_commit(db, client: Client, mailoutbox,
+                                                django_capture_on_commit_callbacks):
+    """
+    Test that the verification email is queued only once the transaction commits.
+    """
+    url = reverse('register')
+    request_data = {
+        'email': 'Test@Example.com',
+        'password': 'testpassword',
+    }
+    with django_capture_on_commit_callbacks(execute=False) as callbacks:
+        client.post(url, request_data)
+        assert len(mailoutbox) == 0
+
+    assert len(callbacks) == 1
+    callbacks[0]()
+
+    assert len(mailoutbox) == 1
+    assert mailoutbox[0].to == ['test@example.com']
+    pending_user = PendingUser.objects.get(email='test@example.com')
+    assert pending_user.verification_code in mailoutbox[0].alternatives[0][0]
+
+
+def test_password_reset_token_is_stored_hashed_and_used_once(db, client: Client, user_instance, mailoutbox,
+                                                            django_capture_on_commit_callbacks,
+                                                            django_assert_max_num_queries):
+    """
+    Test that only a digest of the emailed token is stored, and that the link works exactly once.
+    """
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post(reverse('password_reset'), {'email': user_instance.email})
+    raw_token = re.search(r'token=(\w+)', mailoutbox[0].alternatives[0][0]).group(1)
+    token = Token.objects.get(user=user_instance)
+    assert token.digest == Token.digest_for(raw_token) != raw_token
+
+    request_data = {
+        'password1': 'newpassword123',
+        'password2': 'newpassword123',
+        'email': user_instance.email,
+        'token': raw_token,
+    }
+    with django_assert_max_num_queries(5) as captured:
+        response = client.post(reverse('set_new_password'), request_data)
+    # The token and its user in one query, then the DELETE and the password UPDATE
+    statements = [query['sql'].split()[0] for query in captured if 'SAVEPOINT' not in query['sql']]
+    assert statements == ['SELECT', 'DELETE', 'UPDATE']
+    assert response.url == reverse('login')
+
+    response = client.post(reverse('set_new_password'), {**request_data, 'password1': 'x', 'password2': 'x'})
+    assert response.url == reverse('password_reset')
+    user_instance.refresh_from_db()
+    assert user_instance.check_password('newpassword123')
+
+
+def test_failed_login_sends_signal(client: Client, user_instance):
+    """
+    Test that sign-ins go through the configured backends, which report failures with user_login_failed.
+    """
+    failures = []
+
+    def record(sender, credentials, **kwargs):
+        failures.append(credentials)
+
+    user_login_failed.connect(record)
+    try:
+        client.post(reverse('login'), {'email': user_instance.email, 'password': 'wrong'})
+    finally:
+        user_login_failed.disconnect(record)
+    assert [credentials['email'] for credentials in failures] == [user_instance.email]
+
+    client.post(reverse('login'), {'email': user_instance.email, 'password': 'testpassword'})
+    assert client.session[BACKEND_SESSION_KEY] == 'accounts.hashing.HashingPoolBackend'
+
+
+def test_login_is_throttled_before_hashing(client: Client, user_instance, settings):
+    """
+    Test that attempts beyond the per-email limit are refused without checking the password.
+    """
+    settings.AUTH_RATE_LIMIT_PER_EMAIL = (2, 1 / 3600)
+    url = reverse('login')
+    for _ in range(2):
+        assert client.post(url, {'email': user_instance.email, 'password': 'wrong'}).status_code == 302
+
+    with mock.patch('accounts.hashing.check_password') as check:
+        response = client.post(url, {'email': user_instance.email.upper(), 'password': 'testpassword'})
+    assert response.status_code == 429
+    assert int(response['Retry-After']) > 0
+    check.assert_not_called()
+    assert not get_user(response.wsgi_request).is_authenticated
+    assert "Too many attempts. Please try again later." in response.content.decode()
+
+
+def test_login_failures_throttled_across_addresses(client: Client, user_instance, settings):
+    """
+    Test that guesses at one account from many addresses share its limit, while successful sign-ins don't use it up.
+    """
+    settings.AUTH_RATE_LIMIT_PER_EMAIL = (2, 1 / 3600)
+    url = reverse('login')
+    for _ in range(3):
+        response = client.post(url, {'email': user_instance.email, 'password': 'testpassword'})
+        assert get_user(response.wsgi_request).is_authenticated
+        client.logout()
+
+    for address in ('198.51.100.1', '198.51.100.2'):
+        client.post(url, {'email': user_instance.email, 'password': 'wrong'}, REMOTE_ADDR=address)
+    response = client.post(url, {'email': user_instance.email, 'password': 'wrong'}, REMOTE_ADDR='198.51.100.3')
+    assert response.status_code == 429
+
+
+def test_unknown_client_address_falls_back_to_per_email_limit(db, client: Client, settings):
+    """
+    Test that clients without a known address don't share one per-IP bucket, and are limited per email instead.
+    """
+    settings.AUTH_RATE_LIMIT_PER_IP = (1, 1 / 3600)
+    settings.AUTH_RATE_LIMIT_PER_EMAIL = (1, 1 / 3600)
+    url = reverse('register')
+    for email in ('first@example.com', 'second@example.com'):
+        assert client.post(url, {'email': email, 'password': 'testpassword'}, REMOTE_ADDR='').status_code == 200
+
+    response = client.post(url, {'email': 'first@example.com', 'password': 'testpassword'}, REMOTE_ADDR='')
+    assert response.status_code == 429
+
+
+def test_register_is_throttled_per_ip(db, client: Client, settings):
+    """
+    Test that sign-ups from one address are limited whatever email they use.
+    """
+    settings.AUTH_RATE_LIMIT_PER_IP = (1, 1 / 3600)
+    url = reverse('register')
+    assert client.post(url, {'email': 'first@example.com', 'password': 'testpassword'}).status_code == 200
+
+    response = client.post(url, {'email': 'second@example.com', 'password': 'testpassword'})
+    assert response.status_code == 429
+    assert not PendingUser.objects.filter(email='second@example.com').exists()
@@ -1,32 +1,55 @@
+import math
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
 from django.http import HttpRequest, HttpResponse
 from accounts.models import User, PendingUser, Token, TokenType
 from django.contrib import messages, auth  # Import the custom user model
-from django.contrib.auth.hashers import make_password
 from django.utils.crypto import get_random_string
 from datetime import datetime, timezone
+from common.ratelimit import acharge_failure, athrottle
 from common.tasks import send_verification_email
 from django.contrib.auth import get_user_model
+from django.db import transaction
 
 from accounts.decorators import redirect_authenticated_user
+from accounts.hashing import amake_password
 
 # Create your views here.
 def home(request: HttpRequest):
     return render(request, 'home.html')
 
 
+def too_many_attempts(request: HttpRequest, template: str, wait: float, context=None) -> HttpResponse:
+    """
+    Refuse a throttled attempt, telling the client when to retry.
+    """
+    messages.error(request, "Too many attempts. Please try again later.")
+    response = render(request, template, context, status=429)
+    response['Retry-After'] = str(math.ceil(wait))
+    return response
+
+
 @redirect_authenticated_user
-def login(request: HttpRequest):
+async def login(request: HttpRequest):
     if request.method == 'POST':
-        email: str = request.POST.get('email')
-        password: str = request.POST.get('password')
-        user = auth.authenticate(request, email=email.lower(), password=password)
+        email: str = request.POST.get('email', '')
+        password: str = request.POST.get('password', '')
+
+        # Throttle before hashing, so a burst of guesses can't take every core. Only
+        # failures count against the email, so guessing can't lock its owner out
+        wait = await athrottle(request, 'login', email, charge_email=False)
+        if wait:
+            return too_many_attempts(request, 'login.html', wait)
+
+        user = await auth.aauthenticate(request, email=email.lower(), password=password)
         
         if user is not None:
-            auth.login(request, user)
+            await auth.alogin(request, user)
             messages.success(request, "Login successful.")
             return redirect('home')
         else:
+            await acharge_failure(request, 'login', email)
             messages.error(request, "Invalid email or password.")
             return redirect('login')
         
@@ -40,29 +63,33 @@ def logout(request: HttpRequest):
 
 
 @redirect_authenticated_user
-def register(request: HttpRequest):
+async def register(request: HttpRequest):
     if request.method == 'POST':
         # Handle form submission logic here
-        email : str = request.POST.get('email')
-        password : str = request.POST.get('password')
+        email : str = request.POST.get('email', '')
+        password : str = request.POST.get('password', '')
         cleaned_email = email.lower()
 
-        if User.objects.filter(email=cleaned_email).exists():
+        wait = await athrottle(request, 'register', cleaned_email)
+        if wait:
+            return too_many_attempts(request, 'register.html', wait)
+
+        if await User.objects.filter(email=cleaned_email).aexists():
             messages.error(request, "Email already registered.")
             return redirect('register')
         else:
             # Verify the  email
             code = get_random_string(length=10)
-            PendingUser.objects.update_or_create(
+            await PendingUser.objects.aupdate_or_create(
                 email=cleaned_email,
                 defaults={
-                    'password': make_password(password),
+                    'password': await amake_password(password),
                     'verification_code': code,
                     'created_at': datetime.now(timezone.utc)
                 }
             )
             # Send verification email
-            send_verification_email(
+            await sync_to_async(send_verification_email.delay_on_commit)(
                 subject="Verify your email",
                 email_to=[cleaned_email],
                 html_template='emails/email_verification_template.html',
@@ -81,10 +108,10 @@ def verify_account(request: HttpRequest):
     if request.method == 'POST':
         code: str = request.POST['code']
         email: str = request.POST['email']
-        pending_user: PendingUser = PendingUser.objects.filter(
+        pending_user: PendingUser = PendingUser.objects.live().filter(
             verification_code=code, email=email
         ).first()
-        if pending_user and pending_user.is_valid(): # Assuming is_valid checks if the code is still valid
+        if pending_user:
             user = User.objects.create(
                 email=pending_user.email, password=pending_user.password
             )
@@ -104,20 +131,21 @@ def password_reset(request: HttpRequest):
 
         if user:
             # Generate a password reset token and send it via email
-            token, _ = Token.objects.update_or_create(
+            raw_token = get_random_string(length=20)
+            Token.objects.update_or_create(
                 user=user,
                 token_type=TokenType.PASSWORD_RESET,
                 defaults={
-                    'token': get_random_string(length=20),
+                    'digest': Token.digest_for(raw_token),
                     'created_at': datetime.now(timezone.utc)
                 }
             )
 
             email_data = {
                 'email': email.lower(),
-                'token': token.token,
+                'token': raw_token,
             }
-            send_verification_email(
+            send_verification_email.delay_on_commit(
                 subject="Password Reset Request",
                 email_to=[email.lower()],
                 html_template='emails/password_reset_template.html',
@@ -134,17 +162,43 @@ def password_reset(request: HttpRequest):
     return render(request, 'password_reset.html')
 
 
+def reset_tokens(email: str, raw_token: str):
+    """
+    The live password reset token matching ``raw_token`` and ``email``, with its
+    user, as one indexed query.
+    """
+    return Token.objects.live().select_related('user').filter(
+        digest=Token.digest_for(raw_token or ''), user__email=email, token_type=TokenType.PASSWORD_RESET
+    )
+
+
+def find_reset_token(email: str, raw_token: str) -> Token | None:
+    return reset_tokens(email, raw_token).first()
+
+
+@transaction.atomic
+def _reset_password(token: Token, password_hash: str) -> bool:
+    """
+    Consume ``token`` and give its user the already hashed password, unless
+    a concurrent request used the token first.
+    """
+    # Only the request whose DELETE removes the token may use it
+    if not token.consume():
+        return False
+    token.user.password = password_hash
+    token.user.save(update_fields=['password'])
+    return True
+
+
 def verify_password_reset_link(request: HttpRequest):
     """
     Verify the password reset link and allow the user to set a new password."""
     email = request.GET.get('email')
     reset_token = request.GET.get('token')
 
-    token = Token.objects.filter(
-        user__email=email, token=reset_token, token_type=TokenType.PASSWORD_RESET
-    ).first()
+    token = find_reset_token(email, reset_token)
 
-    if not token or not token.is_valid():
+    if not token:
         messages.error(request, "Invalid or expired password reset link.")
         return redirect('password_reset')
 
@@ -155,30 +209,28 @@ def verify_password_reset_link(request: HttpRequest):
         )
 
 
-def set_new_password(request: HttpRequest):
+async def set_new_password(request: HttpRequest):
     """Set a new password for the user."""
+    request.user = await request.auser()
     password1: str = request.POST.get('password1')
     password2: str = request.POST.get('password2')
     email: str = request.POST.get('email')
     reset_token: str = request.POST.get('token')
+    context = {'token': reset_token, 'email': email}
+
+    wait = await athrottle(request, 'set_new_password', email, charge_email=False)
+    if wait:
+        return too_many_attempts(request, 'set_new_password_using_reset_token.html', wait, context)
 
     if password1 != password2:
         messages.error(request, "Passwords do not match.")
-        return render(
-            request,
-            'set_new_password_using_reset_token.html',
-            context={'token': reset_token, 'email': email}
-            )
+        return render(request, 'set_new_password_using_reset_token.html', context=context)
     
-    token: Token = Token.objects.filter(
-        token=reset_token, user__email=email, token_type=TokenType.PASSWORD_RESET
-    ).first()
-
-    if not token or not token.is_valid():
+    token = await reset_tokens(email, reset_token).afirst()
+    # Hashing happens only for a valid link, and on the hashing pool
+    if not token or not await sync_to_async(_reset_password)(token, await amake_password(password1)):
+        await acharge_failure(request, 'set_new_password', email)
         messages.error(request, "Invalid or expired password reset link.")
         return redirect('password_reset')
-    
-    token.reset_user_password(password1)
-    token.delete()  # Optionally delete the token after use
     messages.success(request, "Your password has been reset successfully. You can now log in.")
     return redirect('login')
\ No newline at end of file
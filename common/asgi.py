@@ -0,0 +1,57 @@
+"""
+ASGI middleware wrapped around the Django application in ``jobboard/asgi.py``.
+"""
+
+
+class BodySizeLimit:
+    """
+    Refuse request bodies larger than ``max_size`` bytes with a 413.
+
+    Django's ASGI handler spools the whole body to a temporary file before any
+    view or upload handler runs, so without this an oversized upload is read to
+    the end however early the view would have turned it away. Bodies announced
+    as too large are refused unread; ones that only turn out too large partway
+    are cut off there, with Django treating the request as aborted.
+    """
+
+    def __init__(self, app, max_size: int):
+        self.app = app
+        self.max_size = max_size
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        length = dict(scope['headers']).get(b'content-length', b'')
+        if length.isdigit() and int(length) > self.max_size:
+            return await self._refuse(send)
+
+        received = 0
+        too_large = False
+
+        async def limited_receive():
+            nonlocal received, too_large
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+                if received > self.max_size:
+                    too_large = True
+                    return {'type': 'http.disconnect'}
+            return message
+
+        await self.app(scope, limited_receive, send)
+        if too_large:
+            await self._refuse(send)
+
+    async def _refuse(self, send):
+        body = b'Request body too large.'
+        await send({
+            'type': 'http.response.start',
+            'status': 413,
+            'headers': [
+                (b'content-type', b'text/plain; charset=utf-8'),
+                (b'content-length', str(len(body)).encode()),
+                (b'connection', b'close'),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': body})
@@ -0,0 +1,112 @@
+"""
+Database query observers scoped to a request or block rather than to a connection.
+
+``connection.execute_wrapper`` only sees the connection of the thread that
+installs it. Under ASGI, middleware runs on the event loop while views run on
+other threads with their own connections, and requests handled at the same
+time would share whatever wrappers one of those connections has. Instead one
+dispatching wrapper is installed on every connection, and hands each query to
+the observers of the context it runs in, which asgiref carries over to the
+thread running the query.
+
+Observers take the same arguments as an execute wrapper.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+_observers: ContextVar[tuple] = ContextVar('query_observers', default=())
+
+
+def _dispatch(execute, sql, params, many, context):
+    call = execute
+    for observer in reversed(_observers.get()):
+        call = partial(observer, call)
+    return call(sql, params, many, context)
+
+
+def _install(connection) -> None:
+    if _dispatch not in connection.execute_wrappers:
+        # Outermost, and never popped by the ``execute_wrapper`` blocks nested inside it
+        connection.execute_wrappers.insert(0, _dispatch)
+
+
+@receiver(connection_created)
+def install_dispatch(sender, connection, **kwargs):
+    _install(connection)
+
+
+@contextmanager
+def observing(*observers):
+    """
+    Pass every query run in this context, on whichever thread, to ``observers``.
+    """
+    for connection in connections.all(initialized_only=True):
+        _install(connection)  # Connections opened before this module was imported
+    token = _observers.set(_observers.get() + observers)
+    try:
+        yield
+    finally:
+        _observers.reset(token)
+
+
+class _ObservedStream:
+    """
+    Streaming content that observes the queries run while each chunk is produced,
+    then calls ``on_close`` once, at the end of the content or when the response is
+    closed before that. Django ignores errors from closing a response, so reaching the
+    end lets those from ``on_close`` reach whoever is reading the content.
+    """
+
+    def __init__(self, content, observers: tuple, on_close):
+        self.content = content
+        self.observers = observers
+        self.on_close = on_close
+        self.closed = False
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.on_close()
+
+
+class _SyncObservedStream(_ObservedStream):
+    def __iter__(self):
+        iterator = iter(self.content)
+        while True:
+            with observing(*self.observers):
+                try:
+                    chunk = next(iterator)
+                except StopIteration:
+                    break
+            yield chunk
+        self.close()
+
+
+class _AsyncObservedStream(_ObservedStream):
+    async def __aiter__(self):
+        iterator = aiter(self.content)
+        while True:
+            with observing(*self.observers):
+                try:
+                    chunk = await anext(iterator)
+                except StopAsyncIteration:
+                    break
+            yield chunk
+        self.close()
+
+
+def observe_response(response, observers: tuple, on_close) -> None:
+    """
+    Keep observing a streaming response's queries while its content is sent,
+    calling ``on_close`` when it is done; other responses are done already.
+    """
+    if not response.streaming:
+        on_close()
+        return
+    stream = _AsyncObservedStream if response.is_async else _SyncObservedStream
+    response.streaming_content = stream(response.streaming_content, observers, on_close)
@@ -0,0 +1,104 @@
+import logging
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Iterable
+
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template.loader import get_template
+
+logger = logging.getLogger(__name__)
+
+BULK_CHUNK_SIZE = 50
+
+
+@dataclass
+class BulkMailResult:
+    """
+    Outcome of a bulk send: the addresses that went out and the error for each that did not.
+    """
+    sent: list[str] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)
+
+
+class _TrackedMessage(EmailMultiAlternatives):
+    """
+    Message that remembers whether a backend got as far as building it.
+
+    Backends build and send messages one after another, so when sending a chunk
+    fails, the messages built before the last one built had already gone out.
+    """
+    attempted = False
+
+    def message(self, *args, **kwargs):
+        self.attempted = True
+        return super().message(*args, **kwargs)
+
+
+def _chunks(items: Iterable, size: int):
+    items = iter(items)
+    while chunk := list(islice(items, size)):
+        yield chunk
+
+
+def _reopen(connection) -> None:
+    """
+    Start a fresh connection after an error; the connection may be unusable after an SMTP error.
+    """
+    try:
+        connection.close()
+        connection.open()
+    except Exception:
+        # Keep going: the remaining sends fail and are recorded one by one
+        logger.exception("Could not reopen the mail connection")
+
+
+def send_bulk_email(subject: str, html_template: str, recipients: Iterable[tuple[str, dict]],
+                    from_email: str | None = None, chunk_size: int = BULK_CHUNK_SIZE,
+                    connection=None) -> BulkMailResult:
+    """
+    Send the same template to many recipients, each with their own context.
+
+    The template is compiled once and every message goes over a single mail
+    connection, ``chunk_size`` messages per ``send_messages`` call. When a chunk
+    fails, the messages it didn't get to are sent one at a time, and a failed
+    recipient is recorded in the result instead of aborting the batch.
+    """
+    template = get_template(html_template)
+    connection = connection or get_connection(fail_silently=False)
+    result = BulkMailResult()
+
+    def send_one(message):
+        try:
+            connection.send_messages([message])
+        except Exception as exc:
+            result.failed[message.to[0]] = str(exc)
+            _reopen(connection)
+        else:
+            result.sent.append(message.to[0])
+
+    connection.open()
+    try:
+        for chunk in _chunks(recipients, chunk_size):
+            messages = []
+            for email_to, context in chunk:
+                msg = _TrackedMessage(subject=subject, from_email=from_email, to=[email_to], connection=connection)
+                msg.attach_alternative(template.render(context), "text/html")
+                messages.append(msg)
+
+            try:
+                connection.send_messages(messages)
+            except Exception:
+                logger.warning("Sending a chunk of %d emails failed, retrying one at a time", len(messages),
+                               exc_info=True)
+                _reopen(connection)
+                attempted = [message for message in messages if message.attempted]
+                # All but the last message attempted were sent before the failure
+                result.sent.extend(message.to[0] for message in attempted[:-1])
+                for message in messages[max(len(attempted) - 1, 0):]:
+                    send_one(message)
+            else:
+                result.sent.extend(message.to[0] for message in messages)
+    finally:
+        connection.close()
+
+    return result
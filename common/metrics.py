@@ -0,0 +1,200 @@
+"""
+Prometheus metrics for the web and worker processes.
+
+Set ``PROMETHEUS_MULTIPROC_DIR`` to an empty, writable directory before the
+processes start and every gunicorn or Celery worker on the host writes its
+samples there; ``/metrics`` then reports the sum across all of them. The
+gunicorn config sets and empties one for the web processes. Celery workers,
+which send the emails, serve their own on ``METRICS_WORKER_PORT``.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.urls import Resolver404, resolve
+from django.template.backends.django import DjangoTemplates, Template
+from django.utils.crypto import constant_time_compare
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+
+from common.dbobserve import observe_response, observing
+
+UNRESOLVED_VIEW = '<unresolved>'
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+
+REQUEST_LATENCY = Histogram(
+    'jobboard_request_latency_seconds', 'Time spent handling a request.', ['view', 'method', 'status'],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    'jobboard_requests_in_flight', 'Requests currently being handled.', ['view'],
+    multiprocess_mode='livesum',
+)
+REQUEST_DB_QUERIES = Histogram(
+    'jobboard_request_db_queries', 'Database queries run per request.', ['view'],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_SECONDS = Histogram(
+    'jobboard_request_db_seconds', 'Time spent in database queries per request.', ['view'],
+)
+TEMPLATE_RENDER_SECONDS = Histogram(
+    'jobboard_template_render_seconds', 'Time spent rendering a template.', ['template'],
+)
+EMAIL_SEND_SECONDS = Histogram(
+    'jobboard_email_send_seconds', 'Time spent sending email from a task.', ['task'],
+)
+EMAIL_FAILURES = Counter(
+    'jobboard_email_failures', 'Emails that could not be sent.', ['task'],
+)
+
+
+class QueryTimer:
+    """
+    Database execute wrapper that counts and times the queries it sees.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+
+
+class RequestObservation:
+    """
+    Latency, in-flight count and database use of one request, recorded by ``finish``.
+    """
+
+    def __init__(self, view: str, method: str):
+        self.view = view
+        self.method = method
+        self.timer = QueryTimer()
+        self.status = '500'
+        self.start = time.perf_counter()
+        REQUESTS_IN_FLIGHT.labels(view).inc()
+
+    def finish(self):
+        REQUESTS_IN_FLIGHT.labels(self.view).dec()
+        REQUEST_LATENCY.labels(self.view, self.method, self.status).observe(time.perf_counter() - self.start)
+        REQUEST_DB_QUERIES.labels(self.view).observe(self.timer.count)
+        REQUEST_DB_SECONDS.labels(self.view).observe(self.timer.seconds)
+
+
+class PrometheusMiddleware:
+    """
+    Record latency, in-flight requests and database use for each view, labelled
+    by URL name. Put it first in ``MIDDLEWARE`` so it sees the whole request.
+    Streaming responses are recorded once their content has been sent.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        observation = RequestObservation(self._view_name(request), request.method)
+        try:
+            with observing(observation.timer):
+                response = self.get_response(request)
+        except BaseException:
+            observation.finish()
+            raise
+        return self._respond(observation, response)
+
+    async def __acall__(self, request: HttpRequest):
+        observation = RequestObservation(self._view_name(request), request.method)
+        try:
+            with observing(observation.timer):
+                response = await self.get_response(request)
+        except BaseException:
+            observation.finish()
+            raise
+        return self._respond(observation, response)
+
+    @staticmethod
+    def _respond(observation: RequestObservation, response: HttpResponse):
+        observation.status = str(response.status_code)
+        observe_response(response, (observation.timer,), observation.finish)
+        return response
+
+    @staticmethod
+    def _view_name(request: HttpRequest) -> str:
+        try:
+            return resolve(request.path_info).view_name
+        except Resolver404:
+            return UNRESOLVED_VIEW
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        with TEMPLATE_RENDER_SECONDS.labels(self.template.origin.template_name or '<string>').time():
+            return super().render(context, request)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """
+    The Django template backend, timing every render of a top-level template.
+    """
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+@contextmanager
+def observe_email(task: str):
+    """
+    Time an email send and count it as failed if it raises.
+    """
+    try:
+        with EMAIL_SEND_SECONDS.labels(task).time():
+            yield
+    except Exception:
+        EMAIL_FAILURES.labels(task).inc()
+        raise
+
+
+def reset_multiprocess_dir() -> None:
+    """
+    Create ``PROMETHEUS_MULTIPROC_DIR`` or empty it of an earlier run's samples.
+    Call it once, before any worker process starts.
+    """
+    path = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if not path:
+        return
+    os.makedirs(path, exist_ok=True)
+    for name in os.listdir(path):
+        if name.endswith('.db'):
+            os.remove(os.path.join(path, name))
+
+
+def metrics_registry():
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def metrics_view(request: HttpRequest):
+    """
+    Expose the metrics in the Prometheus text format, behind ``METRICS_TOKEN`` when it is set.
+    """
+    token = settings.METRICS_TOKEN
+    if token and not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=401)
+    return HttpResponse(generate_latest(metrics_registry()), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,260 @@
+import base64
+import binascii
+import hashlib
+import json
+from collections.abc import Sequence
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+DEFAULT_ORDERING = ('-created_at', '-id')
+
+
+def count_cache_key(queryset) -> str:
+    """
+    Cache key for the row count of ``queryset``, independent of its ordering.
+    """
+    sql, params = queryset.order_by().query.sql_with_params()
+    digest = hashlib.sha256(f'{queryset.db}:{sql}:{params!r}'.encode()).hexdigest()
+    return f'pagination:count:{digest}'
+
+
+def planner_estimate(queryset) -> int | None:
+    """
+    Row count the query planner expects for ``queryset``, or None if the database can't tell.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+
+    queryset = queryset.order_by()
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table],
+            )
+            return max(cursor.fetchone()[0], 0)  # -1 until the table is first analysed
+
+    plan = json.loads(queryset.explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def cached_count(queryset) -> tuple[int, bool]:
+    """
+    Count the rows of ``queryset``, returning ``(count, is_estimate)``.
+
+    Counts are cached for ``PAGINATION_COUNT_CACHE_TIMEOUT`` seconds per query. When
+    the planner expects more than ``PAGINATION_COUNT_ESTIMATE_THRESHOLD`` rows its
+    estimate is used instead of running COUNT(*).
+    """
+    key = count_cache_key(queryset)
+    result = cache.get(key)
+    if result is not None:
+        return tuple(result)
+
+    estimate = planner_estimate(queryset)
+    if estimate is not None and estimate > settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD:
+        result = (estimate, True)
+    else:
+        result = (queryset.count(), False)
+
+    cache.set(key, result, settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+    return result
+
+
+async def acached_count(queryset) -> tuple[int, bool]:
+    """
+    Async version of ``cached_count``.
+    """
+    key = count_cache_key(queryset)
+    result = await cache.aget(key)
+    if result is not None:
+        return tuple(result)
+
+    estimate = await sync_to_async(planner_estimate)(queryset)
+    if estimate is not None and estimate > settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD:
+        result = (estimate, True)
+    else:
+        result = (await queryset.acount(), False)
+
+    await cache.aset(key, result, settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+    return result
+
+
+class CursorPage(Sequence):
+    """
+    One page of a ``CursorPaginator``, with opaque cursors for its neighbours.
+    """
+
+    def __init__(self, object_list: list, paginator: 'CursorPaginator', has_next: bool, has_previous: bool):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self._has_next and bool(self.object_list)
+
+    def has_previous(self) -> bool:
+        return self._has_previous and bool(self.object_list)
+
+    @property
+    def next_cursor(self) -> str | None:
+        if self.has_next():
+            return self.paginator.encode_cursor(self.object_list[-1], reverse=False)
+        return None
+
+    @property
+    def previous_cursor(self) -> str | None:
+        if self.has_previous():
+            return self.paginator.encode_cursor(self.object_list[0], reverse=True)
+        return None
+
+
+class CursorPaginator:
+    """
+    Keyset paginator: pages are found by seeking past the last row seen, so a
+    deep page costs the same as the first and no COUNT(*) is needed to paginate.
+
+    ``ordering`` must identify rows uniquely, hence the trailing ``-id``.
+    """
+
+    def __init__(self, object_list, per_page: int, ordering=DEFAULT_ORDERING):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+
+    @cached_property
+    def _count(self) -> tuple[int, bool]:
+        return cached_count(self.object_list)
+
+    async def acount(self) -> int:
+        """
+        Compute the count through the async ORM, so ``count`` can then be read from async code.
+        """
+        if '_count' not in self.__dict__:
+            self.__dict__['_count'] = await acached_count(self.object_list)
+        return self.count
+
+    @property
+    def count(self) -> int:
+        """
+        Total number of rows, cached and possibly estimated; only computed when asked for.
+        """
+        return self._count[0]
+
+    @property
+    def count_is_estimate(self) -> bool:
+        return self._count[1]
+
+    @property
+    def fields(self) -> list[str]:
+        return [name.lstrip('-') for name in self.ordering]
+
+    def encode_cursor(self, obj, reverse: bool) -> str:
+        # Rows from .values() are dicts rather than model instances
+        read = obj.__getitem__ if isinstance(obj, dict) else partial(getattr, obj)
+        position = [self._serialize(read(name)) for name in self.fields]
+        payload = json.dumps({'p': position, 'r': reverse}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor: str) -> tuple[list, bool] | None:
+        """
+        Return the position and direction stored in ``cursor``, or None if it is not valid.
+        """
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            position = [
+                self._to_python(name, value) for name, value in zip(self.fields, payload['p'], strict=True)
+            ]
+            return position, bool(payload['r'])
+        except (binascii.Error, ValueError, KeyError, TypeError, ValidationError):
+            return None
+
+    def get_page(self, cursor: str | None = None) -> CursorPage:
+        """
+        Return the page after (or, for a previous cursor, before) the cursor.
+        An empty or invalid cursor gives the first page.
+        """
+        queryset, decoded, reverse = self._page_query(cursor)
+        return self._build_page(list(queryset), decoded, reverse)
+
+    async def aget_page(self, cursor: str | None = None) -> CursorPage:
+        """
+        Async version of ``get_page``.
+        """
+        queryset, decoded, reverse = self._page_query(cursor)
+        return self._build_page([row async for row in queryset], decoded, reverse)
+
+    def _page_query(self, cursor: str | None):
+        decoded = self.decode_cursor(cursor) if cursor else None
+        queryset = self.object_list
+        reverse = False
+
+        if decoded:
+            position, reverse = decoded
+            queryset = queryset.filter(self._seek(position, reverse))
+
+        ordering = [self._flip(name) for name in self.ordering] if reverse else self.ordering
+        return queryset.order_by(*ordering)[:self.per_page + 1], decoded, reverse
+
+    def _build_page(self, rows: list, decoded, reverse: bool) -> CursorPage:
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if reverse:
+            rows.reverse()
+            return CursorPage(rows, self, has_next=True, has_previous=has_more)
+        return CursorPage(rows, self, has_next=has_more, has_previous=decoded is not None)
+
+    def _seek(self, position: list, reverse: bool) -> Q:
+        """
+        Rows strictly after ``position`` in the (possibly reversed) ordering.
+        """
+        condition = Q()
+        for index, name in enumerate(self.ordering):
+            lookup = 'lt' if name.startswith('-') != reverse else 'gt'
+            step = Q(**{f'{self.fields[index]}__{lookup}': position[index]})
+            for field, value in zip(self.fields[:index], position[:index]):
+                step &= Q(**{field: value})
+            condition |= step
+        return condition
+
+    def _to_python(self, name: str, value):
+        try:
+            field = self.object_list.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            annotation = self.object_list.query.annotations.get(name)  # Such as a search rank
+            if annotation is None:
+                return value
+            field = annotation.output_field
+        return field.to_python(value)
+
+    @staticmethod
+    def _flip(name: str) -> str:
+        return name[1:] if name.startswith('-') else f'-{name}'
+
+    @staticmethod
+    def _serialize(value):
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()  # Full precision; DjangoJSONEncoder drops microseconds
+        if value is None or isinstance(value, (int, float)):
+            return value
+        return str(value)
@@ -0,0 +1,36 @@
+"""
+Pytest plugin that fails tests whose requests break a view's query budget or
+repeat a query shape. Enabled from the root conftest; ``--no-query-budget``
+turns it off for a run.
+"""
+from contextlib import contextmanager
+
+import pytest
+
+from common.querybudget import record_queries, report
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--no-query-budget", action="store_true", default=False,
+        help="Don't fail tests on query budget or N+1 violations.",
+    )
+
+
+@pytest.fixture(autouse=True)
+def strict_query_budgets(request, settings):
+    settings.QUERY_BUDGET_STRICT = not request.config.getoption("--no-query-budget")
+
+
+@pytest.fixture
+def assert_query_budget(settings):
+    """
+    Check a block of code outside a request against a budget and for repeated query shapes.
+    """
+    @contextmanager
+    def check(max_queries: int | None = None):
+        with record_queries() as recorder:
+            yield recorder
+        report("Block", recorder.problems(max_queries, settings.QUERY_REPEAT_THRESHOLD))
+
+    return check
@@ -0,0 +1,143 @@
+"""
+Per-view query budgets and N+1 detection.
+
+Views declare how many queries a request may run with ``@query_budget(n)``.
+``QueryBudgetMiddleware`` counts the statements a request runs, streamed
+content included, and reports requests that go over their view's budget.
+With ``QUERY_BUDGET_STRICT`` or ``DEBUG`` on it also keeps their SQL, to
+report requests that run the same query shape ``QUERY_REPEAT_THRESHOLD``
+times or more, the usual sign of a query per row. Reports are logged, or
+raised as ``QueryBudgetExceeded`` when ``QUERY_BUDGET_STRICT`` is on, as it
+is in the test suite.
+"""
+import logging
+import re
+from collections import Counter
+from contextlib import contextmanager
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpRequest
+from django.urls import Resolver404, resolve
+
+from common.dbobserve import observe_response, observing
+
+logger = logging.getLogger(__name__)
+
+IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+NUMBER = re.compile(r'\b\d+\b')
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_budget(max_queries: int):
+    """
+    Declare the most queries one request to the decorated view may run.
+    """
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        return view_func
+    return decorator
+
+
+def query_shape(sql: str) -> str:
+    """
+    Reduce a statement to its shape, so queries that only differ in their
+    parameters (or in how many there are in an IN list) compare equal.
+    """
+    return NUMBER.sub('N', IN_LIST.sub('IN (...)', sql))
+
+
+class QueryRecorder:
+    """
+    Query observer that counts the statements it sees, keeping their SQL when ``keep_sql`` is set.
+    """
+
+    def __init__(self, keep_sql: bool = True):
+        self.keep_sql = keep_sql
+        self.count = 0
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        if self.keep_sql:
+            self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    def __len__(self):
+        return self.count
+
+    def repeated_shapes(self, threshold: int) -> dict[str, int]:
+        shapes = Counter(query_shape(sql) for sql in self.queries)
+        return {shape: count for shape, count in shapes.items() if count >= threshold}
+
+    def problems(self, budget: int | None, threshold: int) -> list[str]:
+        problems = []
+        if budget is not None and len(self) > budget:
+            problems.append(f'ran {len(self)} queries, over its budget of {budget}')
+        for shape, count in self.repeated_shapes(threshold).items():
+            problems.append(f'ran the same query {count} times: {shape}')
+        return problems
+
+
+@contextmanager
+def record_queries(keep_sql: bool = True):
+    """
+    Record the statements run inside the block, on whichever thread runs them.
+    """
+    recorder = QueryRecorder(keep_sql)
+    with observing(recorder):
+        yield recorder
+
+
+def report(label: str, problems: list[str]) -> None:
+    if not problems:
+        return
+    message = f'{label} ' + '; '.join(problems)
+    if settings.QUERY_BUDGET_STRICT:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+class QueryBudgetMiddleware:
+    """
+    Check every request against its view's query budget and for repeated query shapes.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with record_queries(self._keep_sql()) as recorder:
+            response = self.get_response(request)
+        observe_response(response, (recorder,), partial(self._check, request, recorder))
+        return response
+
+    async def __acall__(self, request: HttpRequest):
+        with record_queries(self._keep_sql()) as recorder:
+            response = await self.get_response(request)
+        observe_response(response, (recorder,), partial(self._check, request, recorder))
+        return response
+
+    @staticmethod
+    def _keep_sql() -> bool:
+        # Keeping every statement's SQL is only worth it where N+1s are being hunted
+        return settings.QUERY_BUDGET_STRICT or settings.DEBUG
+
+    @staticmethod
+    def _check(request: HttpRequest, recorder: QueryRecorder) -> None:
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return
+        budget = getattr(match.func, 'query_budget', None)
+        report(f'{match.view_name}:', recorder.problems(budget, settings.QUERY_REPEAT_THRESHOLD))
@@ -0,0 +1,150 @@
+"""
+Token-bucket rate limits kept in the Django cache.
+
+A bucket holds up to ``capacity`` tokens and refills at ``rate`` tokens a
+second; every attempt takes one, and attempts on an empty bucket are refused.
+Buckets live in the default cache, which every process shares, and are updated
+with atomic increments rather than read and written back, so concurrent
+attempts can't overdraw them.
+"""
+import hashlib
+import math
+import time
+from contextlib import suppress
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest
+
+
+class TokenBucket:
+    """
+    A bucket is stored as one number: the time, in milliseconds, at which it will
+    be full again. Taking a token moves that a token's worth later with ``incr``;
+    a take that would move it more than a full bucket past now is refused and
+    handed back with ``decr``.
+    """
+
+    def __init__(self, name: str, capacity: int, rate: float):
+        self.name = name
+        self.capacity = capacity
+        self.rate = rate
+        self.interval = round(1000 / rate)
+        self.tolerance = capacity * self.interval
+
+    def _key(self, identity: str) -> str:
+        digest = hashlib.sha256(identity.encode()).hexdigest()
+        return f'ratelimit:{self.name}:{digest}'
+
+    @property
+    def _timeout(self) -> int:
+        # After this long an untouched bucket is full again, the same as no entry at all
+        return math.ceil(self.tolerance / 1000) + 1
+
+    @staticmethod
+    def _now() -> int:
+        return int(time.time() * 1000)
+
+    def _wait(self, full_at: int, now: int) -> float:
+        """
+        Seconds until a bucket full again at ``full_at``, counting this attempt, is within capacity.
+        """
+        return max(0, full_at - self.tolerance - now) / 1000
+
+    def _is_stale(self, full_at: int | None, now: int) -> bool:
+        # No entry, or one left from before the bucket last filled up
+        return full_at is None or full_at - self.interval < now
+
+    def take(self, identity: str) -> float:
+        """
+        Spend a token for ``identity``; returns 0 if allowed, otherwise the seconds until it will be.
+        """
+        key, now = self._key(identity), self._now()
+        try:
+            full_at = cache.incr(key, self.interval)
+        except ValueError:
+            full_at = None
+        if self._is_stale(full_at, now):
+            cache.set(key, now + self.interval, self._timeout)
+            return 0
+
+        wait = self._wait(full_at, now)
+        with suppress(ValueError):  # The entry expired in the meantime
+            if wait:
+                cache.decr(key, self.interval)
+            else:
+                cache.touch(key, self._timeout)
+        return wait
+
+    async def atake(self, identity: str) -> float:
+        """
+        Async version of ``take``.
+        """
+        key, now = self._key(identity), self._now()
+        try:
+            full_at = await cache.aincr(key, self.interval)
+        except ValueError:
+            full_at = None
+        if self._is_stale(full_at, now):
+            await cache.aset(key, now + self.interval, self._timeout)
+            return 0
+
+        wait = self._wait(full_at, now)
+        with suppress(ValueError):
+            if wait:
+                await cache.adecr(key, self.interval)
+            else:
+                await cache.atouch(key, self._timeout)
+        return wait
+
+    async def apeek(self, identity: str) -> float:
+        """
+        The seconds ``atake`` would ask to wait, without taking anything.
+        """
+        full_at, now = await cache.aget(self._key(identity)), self._now()
+        if self._is_stale(full_at, now):
+            return 0
+        return self._wait(full_at + self.interval, now)
+
+
+def client_ip(request: HttpRequest) -> str:
+    """
+    The address the request came from, or '' when it isn't known. Behind a proxy,
+    have the server take it from the proxy's headers (gunicorn's
+    ``--forwarded-allow-ips``, set in the Procfile) rather than trusting clients.
+    """
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _per_email(scope: str) -> TokenBucket:
+    return TokenBucket(f'{scope}:email', *settings.AUTH_RATE_LIMIT_PER_EMAIL)
+
+
+async def athrottle(request: HttpRequest, scope: str, email: str | None, charge_email: bool = True) -> float:
+    """
+    Take a token from the per-IP bucket of ``scope`` and, when ``email`` is given,
+    from the per-email one. With ``charge_email`` off the second is only checked,
+    for views that charge it just for failed attempts with ``acharge_failure``, so
+    an owner signing in doesn't use up their own limit. Returns the seconds to wait
+    when either is empty, else 0.
+    """
+    address = client_ip(request)
+    if email and not address:
+        # Unknown clients would all share one per-IP bucket, so fall back to the
+        # per-email one, charged for every attempt
+        return await _per_email(scope).atake(email.lower())
+
+    per_ip = TokenBucket(f'{scope}:ip', *settings.AUTH_RATE_LIMIT_PER_IP)
+    wait = await per_ip.atake(address)
+    if email and not wait:
+        per_email = _per_email(scope)
+        wait = await (per_email.atake(email.lower()) if charge_email else per_email.apeek(email.lower()))
+    return wait
+
+
+async def acharge_failure(request: HttpRequest, scope: str, email: str | None) -> None:
+    """
+    Count a failed attempt against the per-email bucket of ``scope``, from whichever address it came.
+    """
+    if email:
+        await _per_email(scope).atake(email.lower())
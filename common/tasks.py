@@ -1,11 +1,29 @@
+from smtplib import SMTPException
+
+from celery import shared_task
 from django.core.mail import EmailMultiAlternatives
 from django.template.loader import get_template
 
+from common.mailer import send_bulk_email
+from common.metrics import EMAIL_FAILURES, observe_email
+
 EMAIL_FROM = 'no-reply@jobboard.com'
 
+
+@shared_task(
+    autoretry_for=(SMTPException, OSError),
+    retry_backoff=True,
+    retry_backoff_max=600,
+    retry_jitter=True,
+    max_retries=5,
+)
 def send_verification_email(subject: str, email_to: list[str], html_template, context):
     """
     Send a verification email to the user.
+
+    Runs on a Celery worker; queue it with ``send_verification_email.delay_on_commit(...)``
+    so the message only goes out once the surrounding transaction has committed.
+    Transient SMTP and network errors are retried with exponential backoff.
     """
     msg = EmailMultiAlternatives(
         subject=subject, from_email=EMAIL_FROM, to=email_to
@@ -13,4 +31,18 @@ def send_verification_email(subject: str, email_to: list[str], html_template, co
     html_template = get_template(html_template)
     html_alternative = html_template.render(context)
     msg.attach_alternative(html_alternative, "text/html")
-    msg.send(fail_silently=False)
\ No newline at end of file
+    with observe_email("send_verification_email"):
+        msg.send(fail_silently=False)
+
+
+@shared_task
+def send_bulk_notification(subject: str, html_template: str, recipients: list[tuple[str, dict]]):
+    """
+    Send one template to many recipients over a single connection.
+
+    Returns the failed addresses mapped to their error so they show up in the task result.
+    """
+    with observe_email("send_bulk_notification"):
+        failed = send_bulk_email(subject, html_template, recipients, from_email=EMAIL_FROM).failed
+    EMAIL_FAILURES.labels("send_bulk_notification").inc(len(failed))
+    return failed
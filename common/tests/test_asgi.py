@@ -0,0 +1,64 @@
+from asgiref.sync import async_to_sync
+
+from common.asgi import BodySizeLimit
+
+
+async def echo_length(scope, receive, send):
+    """
+    ASGI app that reads the whole body and answers with its length, or nothing if aborted.
+    """
+    body = b""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": str(len(body)).encode()})
+
+
+def call(app, chunks, headers=()):
+    messages = [{"type": "http.request", "body": chunk, "more_body": True} for chunk in chunks]
+    messages[-1]["more_body"] = False
+    read = []
+    sent = []
+
+    async def receive():
+        read.append(messages[len(read)])
+        return read[-1]
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": "/", "headers": list(headers)}
+    async_to_sync(app)(scope, receive, send)
+    return sent, len(read)
+
+
+def test_body_within_limit_passes_through():
+    """
+    Test that a body up to the limit reaches the application whole.
+    """
+    sent, _ = call(BodySizeLimit(echo_length, 10), [b"12345", b"67890"])
+    assert sent[0]["status"] == 200
+    assert sent[1]["body"] == b"10"
+
+
+def test_announced_oversized_body_is_refused_unread():
+    """
+    Test that a Content-Length over the limit is refused before any of the body is read.
+    """
+    sent, read = call(BodySizeLimit(echo_length, 10), [b"x" * 20], headers=[(b"content-length", b"20")])
+    assert sent[0]["status"] == 413
+    assert read == 0
+
+
+def test_streamed_oversized_body_is_cut_off():
+    """
+    Test that a body without a usable length is refused as soon as it passes the limit.
+    """
+    sent, read = call(BodySizeLimit(echo_length, 10), [b"x" * 6] * 5)
+    assert [message["status"] for message in sent if "status" in message] == [413]
+    assert read == 2
@@ -0,0 +1,97 @@
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+
+from common.mailer import send_bulk_email
+
+
+class FlakyBackend(EmailBackend):
+    """
+    In-memory backend that rejects one address, counting opened connections and send calls.
+    """
+    opened = 0
+    calls = 0
+
+    def open(self):
+        FlakyBackend.opened += 1
+
+    def send_messages(self, messages):
+        FlakyBackend.calls += 1
+        sent = 0
+        for message in messages:
+            message.message()
+            if "bounce@example.com" in message.to:
+                raise OSError("Mailbox unavailable")
+            mail.outbox.append(message)
+            sent += 1
+        return sent
+
+
+class DownBackend(FlakyBackend):
+    """
+    Backend whose server goes away after the first connection.
+    """
+
+    def open(self):
+        super().open()
+        if FlakyBackend.opened > 1:
+            raise OSError("Connection refused")
+
+
+def test_send_bulk_email_renders_each_recipient(mailoutbox):
+    """
+    Test that every recipient gets the template rendered with their own context.
+    """
+    recipients = [
+        (f"applicant{n}@example.com", {"applicant_name": f"Applicant {n}", "job_title": "Engineer"})
+        for n in range(5)
+    ]
+
+    FlakyBackend.calls = 0
+    result = send_bulk_email("Application outcome", "emails/job_application_update.html",
+                             recipients, chunk_size=2, connection=FlakyBackend())
+
+    assert result.sent == [email for email, _ in recipients]
+    assert result.failed == {}
+    assert len(mailoutbox) == 5
+    # One send per chunk
+    assert FlakyBackend.calls == 3
+    assert mailoutbox[3].to == ["applicant3@example.com"]
+    assert "Applicant 3" in mailoutbox[3].alternatives[0][0]
+
+
+def test_send_bulk_email_reports_failures_without_aborting(mailoutbox):
+    """
+    Test that one failing recipient is reported while the rest of the batch is sent.
+    """
+    FlakyBackend.opened = 0
+    FlakyBackend.calls = 0
+    recipients = [
+        ("first@example.com", {}),
+        ("bounce@example.com", {}),
+        ("last@example.com", {}),
+    ]
+
+    result = send_bulk_email("Application outcome", "emails/job_application_update.html",
+                             recipients, connection=FlakyBackend())
+
+    assert result.sent == ["first@example.com", "last@example.com"]
+    assert result.failed == {"bounce@example.com": "Mailbox unavailable"}
+    assert [message.to for message in mail.outbox] == [["first@example.com"], ["last@example.com"]]
+    # The chunk, then the bounce and the message after it alone; the first one went out with the chunk
+    assert FlakyBackend.calls == 3
+    # One connection for the batch, then one reopened after each failure
+    assert FlakyBackend.opened == 3
+
+
+def test_send_bulk_email_survives_unreachable_server(mailoutbox):
+    """
+    Test that a failed reconnect is logged and recorded rather than aborting the run.
+    """
+    FlakyBackend.opened = 0
+    recipients = [("bounce@example.com", {}), ("next@example.com", {})]
+
+    result = send_bulk_email("Application outcome", "emails/job_application_update.html",
+                             recipients, connection=DownBackend())
+
+    assert result.sent == ["next@example.com"]
+    assert set(result.failed) == {"bounce@example.com"}
@@ -0,0 +1,146 @@
+import runpy
+from pathlib import Path
+from smtplib import SMTPException
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test.client import AsyncClient
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from common.metrics import reset_multiprocess_dir
+from common.tasks import send_verification_email
+from job_application.tests.factories import JobAdvertFactory, JobApplicationFactory
+from jobboard.celery import serve_metrics
+
+pytestmark = pytest.mark.django_db
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_middleware_records_view_metrics(authenticate_user):
+    """
+    Test that a request is timed and its queries and template renders counted under its URL name.
+    """
+    client, _ = authenticate_user
+    requests_before = sample('jobboard_request_latency_seconds_count', view='home', method='GET', status='200')
+    queries_before = sample('jobboard_request_db_queries_sum', view='home')
+    renders_before = sample('jobboard_template_render_seconds_count', template='home.html')
+
+    assert client.get(reverse('home')).status_code == 200
+
+    assert sample('jobboard_request_latency_seconds_count', view='home', method='GET', status='200') == requests_before + 1
+    assert sample('jobboard_request_db_queries_sum', view='home') > queries_before
+    assert sample('jobboard_template_render_seconds_count', template='home.html') == renders_before + 1
+    assert sample('jobboard_requests_in_flight', view='home') == 0
+
+
+def test_middleware_counts_queries_under_asgi(user_instance):
+    """
+    Test that queries run by the view's thread are counted when the middleware runs on the event loop.
+    """
+    queries_before = sample('jobboard_request_db_queries_sum', view='my_jobs')
+
+    async def get():
+        client = AsyncClient()
+        await client.aforce_login(user_instance)
+        return await client.get(reverse('my_jobs'))
+
+    assert async_to_sync(get)().status_code == 200
+    assert sample('jobboard_request_db_queries_sum', view='my_jobs') > queries_before
+
+
+def test_streaming_response_recorded_once_sent(authenticate_user):
+    """
+    Test that a streamed download is recorded after its content, and the queries run for it, are sent.
+    """
+    client, user = authenticate_user
+    advert = JobAdvertFactory(created_by=user)
+    JobApplicationFactory(job_advert=advert)
+    view = 'export_advert_applications'
+    requests_before = sample('jobboard_request_latency_seconds_count', view=view, method='GET', status='200')
+    queries_before = sample('jobboard_request_db_queries_sum', view=view)
+
+    response = client.get(reverse(view, kwargs={'advert_id': advert.id}))
+    assert sample('jobboard_requests_in_flight', view=view) == 1
+    queries_before_content = sample('jobboard_request_db_queries_sum', view=view)
+    b"".join(response.streaming_content)
+
+    assert queries_before_content == queries_before
+    assert sample('jobboard_request_latency_seconds_count', view=view, method='GET', status='200') == requests_before + 1
+    assert sample('jobboard_request_db_queries_sum', view=view) >= queries_before + 3
+    assert sample('jobboard_requests_in_flight', view=view) == 0
+
+
+def test_email_failures_counted(settings, monkeypatch):
+    """
+    Test that a failed verification email is timed and counted.
+    """
+    def fail(self, fail_silently=False):
+        raise SMTPException("mail server down")
+
+    monkeypatch.setattr('django.core.mail.EmailMultiAlternatives.send', fail)
+    failures_before = sample('jobboard_email_failures_total', task='send_verification_email')
+
+    with pytest.raises(SMTPException):
+        send_verification_email.run("Subject", ["ann@example.com"], "emails/job_application_update.html", {})
+
+    assert sample('jobboard_email_failures_total', task='send_verification_email') == failures_before + 1
+
+
+def test_metrics_endpoint(client, settings):
+    """
+    Test that /metrics serves the text format, behind the token when one is set.
+    """
+    response = client.get(reverse('metrics'))
+    assert response.status_code == 200
+    assert b'jobboard_request_latency_seconds' in response.content
+
+    settings.METRICS_TOKEN = "secret"
+    assert client.get(reverse('metrics')).status_code == 401
+    assert client.get(reverse('metrics'), HTTP_AUTHORIZATION="Bearer secret").status_code == 200
+
+
+def test_gunicorn_hooks_manage_multiprocess_dir(monkeypatch, tmp_path):
+    """
+    Test that gunicorn starts from an empty samples directory and survives a worker dying without one.
+    """
+    monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(tmp_path))
+    (tmp_path / 'counter_123.db').write_bytes(b'stale')
+    config = runpy.run_path(str(Path(__file__).resolve().parents[2] / 'gunicorn.conf.py'))
+
+    config['on_starting'](server=None)
+    assert list(tmp_path.iterdir()) == []
+
+    class Worker:
+        pid = 123
+
+    config['child_exit'](None, Worker())
+    monkeypatch.delenv('PROMETHEUS_MULTIPROC_DIR')
+    config['child_exit'](None, Worker())
+
+
+def test_reset_multiprocess_dir_creates_directory(monkeypatch, tmp_path):
+    """
+    Test that a samples directory that doesn't exist yet is created.
+    """
+    monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(tmp_path / 'worker'))
+    reset_multiprocess_dir()
+    assert (tmp_path / 'worker').is_dir()
+
+
+def test_celery_worker_serves_its_own_metrics(monkeypatch, settings, tmp_path):
+    """
+    Test that a starting worker empties its samples directory and serves the metrics of its pool.
+    """
+    started = []
+    monkeypatch.setattr('prometheus_client.start_http_server', lambda *args: started.append(args))
+    monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(tmp_path))
+    (tmp_path / 'histogram_123.db').write_bytes(b'stale')
+    settings.METRICS_WORKER_PORT = 9808
+
+    serve_metrics()
+    assert list(tmp_path.iterdir()) == []
+    assert started[0][:2] == (9808, settings.METRICS_WORKER_ADDRESS)
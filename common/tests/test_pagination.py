@@ -0,0 +1,86 @@
+import pytest
+from asgiref.sync import async_to_sync
+
+from common.pagination import CursorPaginator
+from job_application.models import JobAdvert
+from job_application.tests.factories import JobAdvertFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_cursor_paginator_walks_forward_and_back(user_instance):
+    """
+    Test that next and previous cursors visit every row once, in order.
+    """
+    JobAdvertFactory.create_batch(7, created_by=user_instance)
+    expected = list(JobAdvert.objects.order_by('-created_at', '-id'))
+    paginator = CursorPaginator(JobAdvert.objects.all(), 3)
+
+    pages = [paginator.get_page()]
+    while pages[-1].has_next():
+        pages.append(paginator.get_page(pages[-1].next_cursor))
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [advert for page in pages for advert in page] == expected
+    assert not pages[0].has_previous()
+
+    previous = paginator.get_page(pages[2].previous_cursor)
+    assert list(previous) == list(pages[1])
+    first = paginator.get_page(previous.previous_cursor)
+    assert list(first) == list(pages[0])
+    assert not first.has_previous()
+
+
+def test_cursor_paginator_ignores_invalid_cursor(user_instance):
+    """
+    Test that a tampered cursor falls back to the first page.
+    """
+    JobAdvertFactory.create_batch(2, created_by=user_instance)
+    paginator = CursorPaginator(JobAdvert.objects.all(), 10)
+
+    page = paginator.get_page('not-a-cursor')
+    assert len(page) == 2
+    assert not page.has_previous()
+
+
+def test_cursor_paginator_count_is_cached(user_instance, django_assert_num_queries):
+    """
+    Test that the total count is computed once and then served from the cache.
+    """
+    JobAdvertFactory.create_batch(3, created_by=user_instance)
+    queryset = JobAdvert.objects.filter(created_by=user_instance)
+
+    assert CursorPaginator(queryset, 10).count == 3
+
+    JobAdvertFactory(created_by=user_instance)
+    with django_assert_num_queries(0):
+        paginator = CursorPaginator(queryset.order_by('title'), 10)
+        assert paginator.count == 3  # Same filters, so the cached count is reused
+        assert not paginator.count_is_estimate
+
+
+def test_cursor_paginator_uses_planner_estimate_for_large_results(user_instance, settings, monkeypatch):
+    """
+    Test that a large planner estimate replaces the exact count.
+    """
+    settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD = 1000
+    monkeypatch.setattr('common.pagination.planner_estimate', lambda queryset: 250_000)
+
+    paginator = CursorPaginator(JobAdvert.objects.all(), 10)
+    assert paginator.count == 250_000
+    assert paginator.count_is_estimate
+
+
+def test_cursor_paginator_async_matches_sync(user_instance):
+    """
+    Test that aget_page and acount return what get_page and count do.
+    """
+    JobAdvertFactory.create_batch(5, created_by=user_instance)
+    paginator = CursorPaginator(JobAdvert.objects.all(), 2)
+    second = paginator.get_page(paginator.get_page().next_cursor)
+
+    async_paginator = CursorPaginator(JobAdvert.objects.all(), 2)
+    async_second = async_to_sync(async_paginator.aget_page)(paginator.get_page().next_cursor)
+    assert list(async_second) == list(second)
+    assert async_second.has_previous() and async_second.has_next()
+    assert async_to_sync(async_paginator.acount)() == 5
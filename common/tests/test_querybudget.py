@@ -0,0 +1,91 @@
+import pytest
+from django.urls import reverse
+
+from common.querybudget import QueryBudgetExceeded, QueryRecorder, query_shape
+from job_application import views
+from job_application.models import JobAdvert
+from job_application.tests.factories import JobAdvertFactory, JobApplicationFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def spy(method, calls: list):
+    def wrapper(self, *args):
+        calls.append(self)
+        return method(self, *args)
+    return wrapper
+
+
+def test_query_shape_ignores_parameters():
+    """
+    Test that statements differing only in literals or IN list length share a shape.
+    """
+    assert query_shape('SELECT * FROM t WHERE id IN (%s, %s) LIMIT 21') == query_shape(
+        'SELECT * FROM t WHERE id IN (%s) LIMIT 1'
+    )
+
+
+def test_request_over_budget_fails(authenticate_user, monkeypatch):
+    """
+    Test that a request running more queries than its view allows raises in tests.
+    """
+    client, _ = authenticate_user
+    monkeypatch.setattr(views.my_jobs, 'query_budget', 1)
+
+    with pytest.raises(QueryBudgetExceeded, match='my_jobs: ran 3 queries, over its budget of 1'):
+        client.get(reverse('my_jobs'))
+
+
+def test_streamed_queries_count_against_budget(authenticate_user, monkeypatch):
+    """
+    Test that queries run while a streaming response is sent count toward its view's budget.
+    """
+    client, user = authenticate_user
+    advert = JobAdvertFactory(created_by=user)
+    monkeypatch.setattr(views.export_advert_applications, 'query_budget', 3, raising=False)
+
+    response = client.get(reverse('export_advert_applications', kwargs={'advert_id': advert.id}))
+    with pytest.raises(QueryBudgetExceeded, match='export_advert_applications: ran 4 queries'):
+        b"".join(response.streaming_content)
+
+
+def test_sql_only_kept_when_strict_or_debug(authenticate_user, monkeypatch, settings, caplog):
+    """
+    Test that outside strict mode and DEBUG budgets are still checked, without keeping each statement.
+    """
+    client, _ = authenticate_user
+    settings.QUERY_BUDGET_STRICT = False
+    settings.DEBUG = False
+    monkeypatch.setattr(views.my_jobs, 'query_budget', 1)
+    recorders = []
+    monkeypatch.setattr('common.querybudget.QueryRecorder.problems', spy(QueryRecorder.problems, recorders))
+
+    assert client.get(reverse('my_jobs')).status_code == 200
+    assert 'my_jobs: ran 3 queries, over its budget of 1' in caplog.text
+    assert recorders[0].queries == []
+
+
+def test_repeated_queries_fail(user_instance, assert_query_budget):
+    """
+    Test that running one query shape per row is flagged as an N+1.
+    """
+    adverts = JobAdvertFactory.create_batch(5, created_by=user_instance)
+
+    with pytest.raises(QueryBudgetExceeded, match='ran the same query 5 times'):
+        with assert_query_budget():
+            for advert in adverts:
+                JobAdvert.objects.get(pk=advert.pk)
+
+
+def test_application_lists_stay_within_budget(authenticate_user):
+    """
+    Test that listing many applications loads their adverts without a query per row.
+    """
+    client, user = authenticate_user
+    for advert in JobAdvertFactory.create_batch(6, created_by=user):
+        JobApplicationFactory(job_advert=advert, email=user.email)
+
+    assert client.get(reverse('my_applications')).status_code == 200
+    advert = JobAdvert.objects.first()
+    JobApplicationFactory.create_batch(6, job_advert=advert, email="other@example.com")
+    assert client.get(reverse('advert_applications', kwargs={'advert_id': advert.id})).status_code == 200
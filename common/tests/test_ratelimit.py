@@ -0,0 +1,32 @@
+from unittest import mock
+
+from common.ratelimit import TokenBucket
+
+
+def test_token_bucket_refills_over_time():
+    """
+    Test that a bucket allows a burst, refuses once empty with the wait until the next token, then refills.
+    """
+    bucket = TokenBucket('test', capacity=2, rate=0.5)
+    with mock.patch('common.ratelimit.time.time', return_value=1000.0):
+        assert bucket.take('203.0.113.7') == 0
+        assert bucket.take('203.0.113.7') == 0
+        assert bucket.take('203.0.113.7') == 2.0
+        assert bucket.take('198.51.100.1') == 0
+
+    with mock.patch('common.ratelimit.time.time', return_value=1002.0):
+        assert bucket.take('203.0.113.7') == 0
+        assert bucket.take('203.0.113.7') > 0
+
+
+def test_refused_attempts_spend_nothing():
+    """
+    Test that hammering an empty bucket doesn't push back when it refills.
+    """
+    bucket = TokenBucket('test', capacity=1, rate=1)
+    with mock.patch('common.ratelimit.time.time', return_value=1000.0):
+        assert bucket.take('203.0.113.7') == 0
+        assert [bucket.take('203.0.113.7') for _ in range(5)] == [1.0] * 5
+
+    with mock.patch('common.ratelimit.time.time', return_value=1001.0):
+        assert bucket.take('203.0.113.7') == 0
@@ -1,8 +1,37 @@
 import pytest
+from django.core.cache import cache
 from django.test.client import Client
 from django.contrib.auth.hashers import make_password, check_password
 
 from accounts.models import User
+from jobboard.celery import app as celery_app
+
+pytest_plugins = ["common.pytest_querybudget"]
+
+@pytest.fixture(autouse=True)
+def celery_eager():
+    """
+    Run Celery tasks inline so the suite does not need a broker.
+    """
+    celery_app.conf.update(CELERY_TASK_ALWAYS_EAGER=True, CELERY_TASK_EAGER_PROPAGATES=True)
+    yield
+    celery_app.conf.update(CELERY_TASK_ALWAYS_EAGER=False, CELERY_TASK_EAGER_PROPAGATES=False)
+
+@pytest.fixture(autouse=True)
+def clear_cache(settings):
+    """
+    Use a local-memory cache instead of Redis, empty at the start of every test
+    so cached counts and pages don't leak between tests.
+    """
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    cache.clear()
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    """
+    Keep uploaded files out of the project's media directory.
+    """
+    settings.MEDIA_ROOT = tmp_path / "media"
 
 @pytest.fixture
 def client():
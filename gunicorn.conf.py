@@ -0,0 +1,24 @@
+"""
+Gunicorn settings, picked up automatically from the working directory.
+"""
+import os
+import tempfile
+
+# Workers write their samples here for /metrics to add up. prometheus_client reads
+# this when it is first imported, so it has to be set before anything imports it.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'jobboard-metrics', 'web'))
+
+
+def on_starting(server):
+    from common.metrics import reset_multiprocess_dir
+
+    reset_multiprocess_dir()
+
+
+def child_exit(server, worker):
+    # Drop the live gauges of a worker that has gone, so in-flight counts stay true
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
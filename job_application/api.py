@@ -0,0 +1,129 @@
+"""
+Read-only JSON API over published job adverts, for aggregator partners.
+
+Rows are read with ``values()`` so no model instances are built, encoded with
+orjson, paged with cursors and answered with 304 when the partner's copy is current.
+"""
+import hashlib
+
+import orjson
+from django.http import HttpRequest, HttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_safe
+
+from common.pagination import DEFAULT_ORDERING, CursorPaginator
+from common.querybudget import query_budget
+from job_application.cache import advert_list_generation, advert_list_generation_is_shared
+from job_application.models import JobAdvert
+from job_application.search import filter_adverts
+
+API_VERSION = 'v1'
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+LIST_FIELDS = (
+    'id', 'title', 'company_name', 'experience_level', 'employment_type', 'job_type',
+    'location', 'skills', 'deadline', 'created_at', 'updated_at',
+)
+DETAIL_FIELDS = (*LIST_FIELDS, 'description')
+
+
+def json_response(data, status: int = 200) -> HttpResponse:
+    return HttpResponse(orjson.dumps(data), content_type='application/json', status=status)
+
+
+def _page_size(request: HttpRequest) -> int:
+    try:
+        return min(max(int(request.GET.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        return DEFAULT_PAGE_SIZE
+
+
+def _page_url(request: HttpRequest, cursor: str | None) -> str | None:
+    if cursor is None:
+        return None
+    params = request.GET.copy()
+    params['cursor'] = cursor
+    return request.build_absolute_uri(f'{request.path}?{params.urlencode()}')
+
+
+def _with_url(request: HttpRequest, advert: dict) -> dict:
+    advert['url'] = request.build_absolute_uri(reverse('get_advert', kwargs={'advert_id': advert['id']}))
+    return advert
+
+
+def _list_etag(request: HttpRequest, *args, **kwargs) -> str | None:
+    """
+    Listings change only when an advert is saved or deleted, or a deadline passes,
+    so the ETag is known without touching the database. That only holds while the
+    generation lives in a cache every process shares; otherwise there's no ETag.
+    """
+    if not advert_list_generation_is_shared():
+        return None
+    version = f'{API_VERSION}:{advert_list_generation()}:{timezone.now().date()}:{request.get_full_path()}'
+    return hashlib.sha256(version.encode()).hexdigest()
+
+
+def _paginated_adverts(request: HttpRequest, queryset, ordering=DEFAULT_ORDERING) -> HttpResponse:
+    fields = LIST_FIELDS
+    if 'search_rank' in queryset.query.annotations:
+        fields = (*fields, 'search_rank')
+
+    paginator = CursorPaginator(queryset.values(*fields), _page_size(request), ordering)
+    page = paginator.get_page(request.GET.get('cursor'))
+    return json_response({
+        'results': [_with_url(request, advert) for advert in page],
+        'next': _page_url(request, page.next_cursor),
+        'previous': _page_url(request, page.previous_cursor),
+    })
+
+
+@query_budget(2)
+@require_safe
+@cache_control(public=True, max_age=60)
+@condition(etag_func=_list_etag)
+def advert_list(request: HttpRequest):
+    active_adverts = JobAdvert.objects.filter(is_published=True, deadline__gte=timezone.now().date())
+    return _paginated_adverts(request, active_adverts)
+
+
+@query_budget(2)
+@require_safe
+@cache_control(public=True, max_age=60)
+@condition(etag_func=_list_etag)
+def advert_search(request: HttpRequest):
+    adverts, ordering = filter_adverts(JobAdvert.objects.all(), request.GET)
+    return _paginated_adverts(request, adverts, ordering)
+
+
+def _advert_values(request: HttpRequest, advert_id) -> dict | None:
+    """
+    Fetch the advert's fields once per request, for both the ETag and the body.
+    """
+    if not hasattr(request, '_advert_values'):
+        request._advert_values = JobAdvert.objects.filter(pk=advert_id, is_published=True).values(
+            *DETAIL_FIELDS
+        ).first()
+    return request._advert_values
+
+
+def _detail_etag(request: HttpRequest, advert_id) -> str | None:
+    advert = _advert_values(request, advert_id)
+    if advert is None:
+        return None
+    version = f'{API_VERSION}:{advert_id}:{advert["updated_at"].isoformat()}'
+    return hashlib.sha256(version.encode()).hexdigest()
+
+
+@query_budget(2)
+@require_safe
+@cache_control(public=True, max_age=60)
+@condition(etag_func=_detail_etag)
+def advert_detail(request: HttpRequest, advert_id):
+    advert = _advert_values(request, advert_id)
+    if advert is None:
+        return json_response({'detail': 'Not found.'}, status=404)
+    return json_response(_with_url(request, advert))
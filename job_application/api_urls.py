@@ -0,0 +1,11 @@
+from django.urls import path
+from . import api
+
+
+app_name = "api_v1"
+
+urlpatterns = [
+    path("adverts/", api.advert_list, name="advert_list"),
+    path("adverts/search/", api.advert_search, name="advert_search"),
+    path("adverts/<uuid:advert_id>/", api.advert_detail, name="advert_detail"),
+]
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class JobApplicationConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "job_application"
+
+    def ready(self):
+        from job_application import signals  # noqa: F401
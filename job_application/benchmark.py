@@ -0,0 +1,137 @@
+"""
+Latency and query-count benchmark of the main job board pages.
+
+Each scenario is requested repeatedly through the Django test client; the
+timings are reduced to p50/p95/p99 in milliseconds and compared with a
+baseline saved by an earlier run.
+"""
+import json
+import random
+import statistics
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+
+from common.querybudget import record_queries
+from job_application.models import JobAdvert
+from job_application.search import search_terms
+
+RESUME_CONTENT = b'%PDF-1.4 benchmark resume'
+
+
+@dataclass
+class Result:
+    p50: float
+    p95: float
+    p99: float
+    queries: int
+
+
+class Scenarios:
+    """
+    The requests to benchmark, one method per page, each returning
+    ``(method, url, data)`` for the next request.
+    """
+    names = ('list_adverts', 'search', 'get_advert', 'apply', 'my_jobs', 'advert_applications')
+
+    def __init__(self, rng: random.Random, employer):
+        self.rng = rng
+        adverts = list(JobAdvert.objects.values_list('id', 'title').order_by('?')[:1000])
+        self.advert_ids = [advert_id for advert_id, _ in adverts]
+        self.keywords = sorted({term for _, title in adverts for term in search_terms(title) if len(term) > 3})
+        self.employer_advert_ids = list(
+            JobAdvert.objects.filter(created_by=employer).values_list('id', flat=True)[:100]
+        )
+        self.applications = 0
+
+    def list_adverts(self):
+        return 'get', reverse('home'), None
+
+    def search(self):
+        return 'get', reverse('search'), {'keyword': self.rng.choice(self.keywords)}
+
+    def get_advert(self):
+        return 'get', reverse('get_advert', kwargs={'advert_id': self.rng.choice(self.advert_ids)}), None
+
+    def apply(self):
+        self.applications += 1
+        data = {
+            'name': 'Benchmark Applicant',
+            'email': f'benchmark{self.applications}@example.com',
+            'portfolio_url': '',
+            'resume': SimpleUploadedFile('resume.pdf', RESUME_CONTENT),
+        }
+        return 'post', reverse('apply', kwargs={'advert_id': self.rng.choice(self.advert_ids)}), data
+
+    def my_jobs(self):
+        return 'get', reverse('my_jobs'), None
+
+    def advert_applications(self):
+        advert_id = self.rng.choice(self.employer_advert_ids)
+        return 'get', reverse('advert_applications', kwargs={'advert_id': advert_id}), None
+
+
+def percentile(values: list[float], p: int) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[p - 1]
+
+
+def run_benchmark(client, scenarios: Scenarios, requests: int, warmup: int = 5) -> dict[str, Result]:
+    """
+    Time ``requests`` requests of every scenario, after ``warmup`` untimed ones.
+    """
+    results = {}
+    for name in scenarios.names:
+        scenario = getattr(scenarios, name)
+        for _ in range(warmup):
+            method, url, data = scenario()
+            getattr(client, method)(url, data)
+
+        latencies, queries = [], []
+        for _ in range(requests):
+            method, url, data = scenario()
+            with record_queries(keep_sql=False) as recorder:
+                start = time.perf_counter()
+                response = getattr(client, method)(url, data)
+                latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                raise RuntimeError(f'{name} answered {response.status_code} for {url}')
+            queries.append(len(recorder))
+
+        results[name] = Result(
+            p50=percentile(latencies, 50),
+            p95=percentile(latencies, 95),
+            p99=percentile(latencies, 99),
+            queries=max(queries),
+        )
+    return results
+
+
+def load_baseline(path: Path) -> dict[str, Result]:
+    if not path.exists():
+        return {}
+    return {name: Result(**values) for name, values in json.loads(path.read_text()).items()}
+
+
+def save_baseline(path: Path, results: dict[str, Result]) -> None:
+    path.write_text(json.dumps({name: asdict(result) for name, result in results.items()}, indent=2) + '\n')
+
+
+def regressions(results: dict[str, Result], baseline: dict[str, Result], tolerance: float) -> list[str]:
+    """
+    Scenarios whose p95 grew by more than ``tolerance`` (a fraction) or that run more queries.
+    """
+    slower = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if result.p95 > before.p95 * (1 + tolerance):
+            slower.append(f'{name}: p95 {before.p95:.1f}ms -> {result.p95:.1f}ms')
+        if result.queries > before.queries:
+            slower.append(f'{name}: {before.queries} -> {result.queries} queries')
+    return slower
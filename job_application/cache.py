@@ -0,0 +1,61 @@
+"""
+Cached rendering of the public advert list on the home page.
+
+Fragments are keyed by a generation number that every advert save or delete
+bumps, so stale pages are never served and old keys simply expire.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils import timezone
+
+ADVERT_LIST_GENERATION_KEY = 'adverts:list:generation'
+
+
+def advert_list_generation() -> int:
+    # Seed from the clock so a generation lost to eviction never reuses an old number
+    return cache.get_or_set(ADVERT_LIST_GENERATION_KEY, time.time_ns, timeout=None)
+
+
+def advert_list_generation_is_shared() -> bool:
+    """
+    Whether every process sees the same generation. A local-memory cache keeps one
+    per process, so a bump in one worker would go unseen by the others.
+    """
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def bump_advert_list_generation() -> None:
+    try:
+        cache.incr(ADVERT_LIST_GENERATION_KEY)
+    except ValueError:
+        cache.set(ADVERT_LIST_GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+async def aadvert_list_generation() -> int:
+    return await cache.aget_or_set(ADVERT_LIST_GENERATION_KEY, time.time_ns, timeout=None)
+
+
+async def aadvert_list_cache_key(cursor: str | None) -> str:
+    """
+    Key for one page of the advert list. The date is part of it because the
+    list hides adverts past their deadline.
+    """
+    cursor_digest = hashlib.md5((cursor or '').encode(), usedforsecurity=False).hexdigest()
+    return f'adverts:list:{await aadvert_list_generation()}:{timezone.now().date()}:{cursor_digest}'
+
+
+async def aget_or_render_advert_list(cursor: str | None, render) -> str:
+    """
+    Return the cached fragment for ``cursor``, awaiting ``render()`` to build it on a miss.
+    """
+    key = await aadvert_list_cache_key(cursor)
+    fragment = await cache.aget(key)
+    if fragment is None:
+        fragment = await render()
+        await cache.aset(key, fragment, settings.ADVERT_LIST_CACHE_TIMEOUT)
+    return fragment
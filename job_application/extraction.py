@@ -0,0 +1,60 @@
+"""
+Plain-text extraction from uploaded resumes, for full-text search.
+"""
+import re
+import zipfile
+from xml.etree import ElementTree
+
+from pypdf import PdfReader
+from pypdf.errors import PyPdfError
+
+# Longest text kept per resume; anything past this adds little to search
+MAX_TEXT_LENGTH = 100_000
+
+# Largest uncompressed document.xml parsed, so a small zip can't expand into gigabytes
+MAX_DOCUMENT_XML_SIZE = 10 * 1024 * 1024
+
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+def _pdf_text(file) -> str:
+    reader = PdfReader(file)
+    return '\n'.join(page.extract_text() or '' for page in reader.pages)
+
+
+def _docx_text(file) -> str:
+    with zipfile.ZipFile(file) as archive:
+        if archive.getinfo('word/document.xml').file_size > MAX_DOCUMENT_XML_SIZE:
+            raise ValueError('document.xml is too large')
+        # The declared size can lie, so never read past the cap either
+        with archive.open('word/document.xml') as document:
+            xml = document.read(MAX_DOCUMENT_XML_SIZE + 1)
+        if len(xml) > MAX_DOCUMENT_XML_SIZE:
+            raise ValueError('document.xml is too large')
+        root = ElementTree.fromstring(xml)
+    paragraphs = (
+        ''.join(node.text or '' for node in paragraph.iter(f'{WORD_NAMESPACE}t'))
+        for paragraph in root.iter(f'{WORD_NAMESPACE}p')
+    )
+    return '\n'.join(paragraphs)
+
+
+def extract_text(file) -> str:
+    """
+    Return the text of a PDF or DOCX resume, or an empty string for anything
+    else (including legacy DOC files) and for files that can't be parsed.
+    """
+    header = file.read(5)
+    file.seek(0)
+
+    try:
+        if header.startswith(b'%PDF-'):
+            text = _pdf_text(file)
+        elif header.startswith(b'PK\x03\x04'):
+            text = _docx_text(file)
+        else:
+            return ''
+    except (PyPdfError, zipfile.BadZipFile, KeyError, ValueError, ElementTree.ParseError):
+        return ''
+
+    return re.sub(r'[ \t]+', ' ', text).strip()[:MAX_TEXT_LENGTH]
@@ -1,6 +1,9 @@
+import uuid
 from django.forms import ModelForm
+from job_application.enums import ApplicationStatus
 from job_application.models import JobAdvert, JobApplication
 from django import forms
+from django.core.exceptions import ValidationError
 
 
 class JobAdvertForm(ModelForm):
@@ -47,3 +50,24 @@ class JobApplicationForm(ModelForm):
             "portfolio_url": forms.URLInput(attrs={"placeholder": "Portfolio URL (optional)", "class": "form-control"},),
             "resume": forms.FileInput(attrs={"placeholder": "Upload your resume", "class": "form-control", "accept": ".pdf,.doc,.docx"}),
         }
+
+
+class MultipleUUIDField(forms.Field):
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        try:
+            return [uuid.UUID(str(item)) for item in value or []]
+        except ValueError:
+            raise ValidationError("Enter a valid list of application ids.", code="invalid")
+
+
+class BulkDecisionForm(forms.Form):
+    status = forms.ChoiceField(
+        choices=[
+            (ApplicationStatus.INTERVIEW_SCHEDULED, "Schedule interview"),
+            (ApplicationStatus.REJECTED, "Reject"),
+        ],
+        widget=forms.Select(attrs={"class": "form-control"}),
+    )
+    application_ids = MultipleUUIDField()
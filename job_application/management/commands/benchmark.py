@@ -0,0 +1,92 @@
+import random
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from accounts.models import User
+from job_application.benchmark import Scenarios, load_baseline, regressions, run_benchmark, save_baseline
+from job_application.seeding import seed, seeded_email
+from jobboard.celery import app as celery_app
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database and report p50/p95/p99 latency and query "
+        "counts for the main pages, compared with a saved baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--adverts", type=int, default=10_000, help="Adverts to seed.")
+        parser.add_argument("--applications", type=int, default=5, help="Applications per advert.")
+        parser.add_argument("--users", type=int, default=10_000, help="Users to seed.")
+        parser.add_argument("--employers", type=int, default=100, help="Users the adverts are spread over.")
+        parser.add_argument("--requests", type=int, default=200, help="Timed requests per page.")
+        parser.add_argument("--warmup", type=int, default=10, help="Untimed requests per page first.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed for data and requests.")
+        parser.add_argument(
+            "--baseline", type=Path, default=Path(settings.BASE_DIR) / "benchmark_baseline.json",
+            help="Baseline file to compare with.",
+        )
+        parser.add_argument("--save-baseline", action="store_true", help="Write this run as the new baseline.")
+        parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed p95 slowdown, as a fraction.")
+        parser.add_argument("--fail-on-regression", action="store_true", help="Exit non-zero on a regression.")
+        parser.add_argument("--keepdb", action="store_true", help="Keep and reuse the seeded test database.")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options["keepdb"])
+        # No broker is needed: tasks run inline, and the tiny benchmark resume keeps them cheap
+        celery_app.conf.update(CELERY_TASK_ALWAYS_EAGER=True)
+        # Nor a Redis server: one process only needs a local cache
+        local_cache = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        try:
+            with (
+                tempfile.TemporaryDirectory() as media_root,
+                override_settings(MEDIA_ROOT=media_root, CACHES=local_cache),
+            ):
+                results = self.benchmark(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+            teardown_test_environment()
+
+        baseline = load_baseline(options["baseline"])
+        self.report(results, baseline)
+
+        if options["save_baseline"]:
+            save_baseline(options["baseline"], results)
+            self.stdout.write(self.style.SUCCESS(f"Saved baseline to {options['baseline']}."))
+
+        slower = regressions(results, baseline, options["tolerance"])
+        for line in slower:
+            self.stdout.write(self.style.WARNING(f"Regression: {line}"))
+        if slower and options["fail_on_regression"]:
+            raise CommandError(f"{len(slower)} regressions against the baseline.")
+
+    def benchmark(self, options):
+        # With --keepdb a database seeded by an earlier run is reused as it is
+        if not User.objects.filter(jobadvert__isnull=False).exists():
+            counts = seed(
+                options["seed"], options["users"], options["employers"], options["adverts"],
+                options["applications"], progress=self.stdout.write,
+            )
+            self.stdout.write(f"Seeded {counts['adverts']} adverts and {counts['applications']} applications.")
+        employer = User.objects.get(email=seeded_email(0))
+
+        client = Client()
+        client.force_login(employer)
+        scenarios = Scenarios(random.Random(options["seed"]), employer)
+        return run_benchmark(client, scenarios, options["requests"], options["warmup"])
+
+    def report(self, results, baseline):
+        self.stdout.write(f"{'page':<22}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}{'p95 vs base':>13}")
+        for name, result in results.items():
+            before = baseline.get(name)
+            change = f"{(result.p95 / before.p95 - 1) * 100:+.1f}%" if before and before.p95 else "-"
+            self.stdout.write(
+                f"{name:<22}{result.p50:>10.1f}{result.p95:>10.1f}{result.p99:>10.1f}{result.queries:>9}{change:>13}"
+            )
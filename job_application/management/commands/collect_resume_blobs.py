@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from job_application.tasks import collect_resume_blobs
+
+
+class Command(BaseCommand):
+    help = "Remove resume files and references left by abandoned uploads, for when Celery beat isn't running."
+
+    def handle(self, *args, **options):
+        collected = collect_resume_blobs()
+        self.stdout.write(self.style.SUCCESS(
+            f"Corrected {collected['references']} blob references, removed {collected['orphaned_files']} orphaned files."
+        ))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from job_application.models import JobApplication, ResumeBlob
+from job_application.storage import resume_storage
+
+
+class Command(BaseCommand):
+    help = "Move resumes saved before content addressing into the shared blob store."
+
+    def handle(self, *args, **options):
+        tracked = ResumeBlob.objects.values_list('name', flat=True)
+        applications = JobApplication.objects.exclude(resume='').exclude(
+            resume__in=tracked
+        ).only('id', 'resume').iterator(chunk_size=500)
+
+        legacy_names = set()
+        moved = 0
+        for application in applications:
+            name = application.resume.name
+            if not resume_storage.exists(name):
+                self.stderr.write(f"Missing resume for application {application.id}: {name}")
+                continue
+
+            # Saving takes the application's reference, which the bulk update below doesn't
+            with transaction.atomic(), resume_storage.open(name) as content:
+                blob_name = resume_storage.save(name, content)
+                JobApplication.objects.filter(pk=application.pk).update(resume=blob_name)
+            legacy_names.add(name)
+            moved += 1
+
+        for name in legacy_names:
+            resume_storage.delete(name)
+
+        blobs = ResumeBlob.objects.count()
+        self.stdout.write(self.style.SUCCESS(
+            f"Moved {moved} resumes into {blobs} blobs, removed {len(legacy_names)} old files."
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from job_application.models import JobApplication
+from job_application.tasks import extract_resume_text
+
+
+class Command(BaseCommand):
+    help = "Queue text extraction for every application whose resume has not been indexed yet."
+
+    def handle(self, *args, **options):
+        pending = JobApplication.objects.filter(resume_text__isnull=True).exclude(resume='')
+        queued = 0
+        for application_id in pending.values_list('id', flat=True).iterator(chunk_size=2000):
+            extract_resume_text.delay(application_id)
+            queued += 1
+        self.stdout.write(self.style.SUCCESS(f"Queued text extraction for {queued} resumes."))
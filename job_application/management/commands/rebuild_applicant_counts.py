@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from job_application.models import JobAdvert
+
+
+class Command(BaseCommand):
+    help = "Recompute JobAdvert.applicant_count from the applications table."
+
+    def handle(self, *args, **options):
+        updated = JobAdvert.rebuild_applicant_counts()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt applicant counts for {updated} adverts."))
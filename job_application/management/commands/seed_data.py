@@ -0,0 +1,44 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from job_application.seeding import SEEDED_PASSWORD, seed, seeded_email
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-create synthetic users, adverts and applications for performance work. "
+        "The same --seed and --epoch always produce the same data, whatever the number of workers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100_000, help="Users to create.")
+        parser.add_argument("--employers", type=int, default=1_000, help="Users the adverts are spread over.")
+        parser.add_argument("--adverts", type=int, default=100_000, help="Adverts to create.")
+        parser.add_argument("--applications", type=int, default=10, help="Applications per advert.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+        parser.add_argument(
+            "--epoch", type=date.fromisoformat, default=None,
+            help="Day the data leads up to, as YYYY-MM-DD; adverts are open from then on. Defaults to today.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per bulk insert.")
+        parser.add_argument("--workers", type=int, default=1, help="Worker processes to spread the batches over.")
+        parser.add_argument("--resumes", action="store_true", help="Write a placeholder PDF for every application.")
+
+    def handle(self, *args, **options):
+        if options["users"] < 1 or options["batch_size"] < 1:
+            raise CommandError("--users and --batch-size must be at least 1.")
+        if options["workers"] > 1 and connection.vendor == "sqlite":
+            # Forked workers would all write to one SQLite file and fail on its lock
+            raise CommandError("--workers needs a database that takes concurrent writers; SQLite doesn't.")
+
+        counts = seed(
+            options["seed"], options["users"], options["employers"], options["adverts"], options["applications"],
+            batch_size=options["batch_size"], workers=options["workers"], resumes=options["resumes"],
+            epoch=options["epoch"], progress=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {counts['users']} users, {counts['adverts']} adverts and {counts['applications']} applications. "
+            f"Sign in as {seeded_email(0)} with the password {SEEDED_PASSWORD!r}."
+        ))
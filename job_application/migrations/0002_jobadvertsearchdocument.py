@@ -0,0 +1,62 @@
+# Generated by Django 5.2.5 on 2026-10-18 06:24
+
+import django.db.models.deletion
+import job_application.search
+from django.db import migrations, models
+
+
+def index_existing_adverts(apps, schema_editor):
+    JobAdvert = apps.get_model("job_application", "JobAdvert")
+    JobAdvertSearchDocument = apps.get_model("job_application", "JobAdvertSearchDocument")
+
+    adverts = JobAdvert.objects.only(
+        "id", "title", "company_name", "skills", "description"
+    ).iterator(chunk_size=2000)
+
+    batch = []
+    for advert in adverts:
+        batch.append(
+            JobAdvertSearchDocument(
+                advert_id=advert.id,
+                document=job_application.search.advert_document(advert),
+            )
+        )
+        if len(batch) == 2000:
+            JobAdvertSearchDocument.objects.bulk_create(batch)
+            batch = []
+    JobAdvertSearchDocument.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job_application", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobAdvertSearchDocument",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("document", job_application.search.SearchDocumentField()),
+                (
+                    "advert",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_document",
+                        to="job_application.jobadvert",
+                    ),
+                ),
+            ],
+        ),
+        job_application.search.CreateSearchIndex("JobAdvertSearchDocument"),
+        migrations.RunPython(index_existing_adverts, migrations.RunPython.noop),
+    ]
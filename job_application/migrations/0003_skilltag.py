@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-18 06:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job_application", "0002_jobadvertsearchdocument"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SkillTag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=50, unique=True)),
+            ],
+            options={
+                "ordering": ("name",),
+            },
+        ),
+        migrations.AddField(
+            model_name="jobadvert",
+            name="skill_tags",
+            field=models.ManyToManyField(
+                blank=True, related_name="adverts", to="job_application.skilltag"
+            ),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.5 on 2026-10-18 06:30
+
+from django.db import migrations
+
+from job_application.skills import parse_skills
+
+BATCH_SIZE = 2000
+
+
+def link_skill_tags(SkillTag, AdvertSkill, advert_skills):
+    names = {name for tags in advert_skills.values() for name in tags}
+    SkillTag.objects.bulk_create(
+        [SkillTag(name=name) for name in names], ignore_conflicts=True
+    )
+    tag_ids = dict(SkillTag.objects.filter(name__in=names).values_list("name", "id"))
+    AdvertSkill.objects.bulk_create(
+        [
+            AdvertSkill(jobadvert_id=advert_id, skilltag_id=tag_ids[name])
+            for advert_id, tags in advert_skills.items()
+            for name in tags
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def backfill_skill_tags(apps, schema_editor):
+    JobAdvert = apps.get_model("job_application", "JobAdvert")
+    SkillTag = apps.get_model("job_application", "SkillTag")
+    AdvertSkill = JobAdvert.skill_tags.through
+
+    adverts = (
+        JobAdvert.objects.exclude(skills__isnull=True)
+        .values_list("id", "skills")
+        .iterator(chunk_size=BATCH_SIZE)
+    )
+    advert_skills = {}
+    for advert_id, skills in adverts:
+        advert_skills[advert_id] = parse_skills(skills)
+        if len(advert_skills) == BATCH_SIZE:
+            link_skill_tags(SkillTag, AdvertSkill, advert_skills)
+            advert_skills = {}
+    link_skill_tags(SkillTag, AdvertSkill, advert_skills)
+
+
+def clear_skill_tags(apps, schema_editor):
+    JobAdvert = apps.get_model("job_application", "JobAdvert")
+    JobAdvert.skill_tags.through.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job_application", "0003_skilltag"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_skill_tags, clear_skill_tags),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-18 06:31
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def count_existing_applicants(apps, schema_editor):
+    JobAdvert = apps.get_model("job_application", "JobAdvert")
+    JobApplication = apps.get_model("job_application", "JobApplication")
+
+    counts = (
+        JobApplication.objects.filter(job_advert=models.OuterRef("pk"))
+        .order_by()
+        .values("job_advert")
+        .annotate(total=models.Count("pk"))
+        .values("total")
+    )
+    JobAdvert.objects.update(applicant_count=Coalesce(models.Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job_application", "0004_backfill_skill_tags"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="jobadvert",
+            name="applicant_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_existing_applicants, migrations.RunPython.noop),
+    ]
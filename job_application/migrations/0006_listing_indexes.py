@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-18 06:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job_application", "0005_jobadvert_applicant_count"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="jobadvert",
+            index=models.Index(
+                condition=models.Q(("is_published", True)),
+                fields=["deadline", "created_at"],
+                name="jobadvert_published_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="jobapplication",
+            index=models.Index(fields=["email"], name="jobapplication_email_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="jobapplication",
+            index=models.Index(
+                fields=["job_advert", "created_at"], name="jobapplication_advert_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-18 06:42
+
+import job_application.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job_application", "0006_listing_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResumeBlob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+                ("size", models.PositiveBigIntegerField()),
+                ("ref_count", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name="jobapplication",
+            name="resume",
+            field=models.FileField(
+                storage=job_application.storage.get_resume_storage, upload_to=""
+            ),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-18 06:51
+
+import django.db.models.deletion
+import job_application.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job_application", "0007_resumeblob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResumeText",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("document", job_application.search.SearchDocumentField()),
+                (
+                    "application",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="resume_text",
+                        to="job_application.jobapplication",
+                    ),
+                ),
+            ],
+        ),
+        job_application.search.CreateSearchIndex("ResumeText"),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 07:39
+
+import job_application.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job_application", "0008_resumetext"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="jobapplication",
+            name="resume",
+            field=models.FileField(
+                db_index=True,
+                storage=job_application.storage.get_resume_storage,
+                upload_to="",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job_application", "0009_jobapplication_resume_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resumeblob",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
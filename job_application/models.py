@@ -5,8 +5,22 @@ from common.models import BaseModel
 from accounts.models import User
 from job_application.enums import EmploymentType, ExperienceLevel, LocationType, ApplicationStatus
 from django.urls import reverse
+from django.db.models.functions import Coalesce
+from job_application.search import SearchDocumentField
+from job_application.skills import SKILL_MAX_LENGTH
+from job_application.storage import get_resume_storage
 
 # Create your models here.
+class SkillTag(models.Model):
+    name = models.CharField(max_length=SKILL_MAX_LENGTH, unique=True)
+
+    class Meta:
+        ordering = ('name',)
+
+    def __str__(self):
+        return self.name
+
+
 class JobAdvert(BaseModel):
     title = models.CharField(max_length=150)
     company_name = models.CharField(max_length=150)
@@ -18,11 +32,21 @@ class JobAdvert(BaseModel):
     is_published = models.BooleanField(default=True)
     deadline = models.DateTimeField()
     skills = models.CharField(max_length=255, blank=True, null=True)
+    skill_tags = models.ManyToManyField(SkillTag, blank=True, related_name='adverts')
     created_by = models.ForeignKey(User, on_delete=models.CASCADE)
+    applicant_count = models.PositiveIntegerField(default=0)  # kept in step by job_application.signals
 
 
     class Meta:
         ordering = ('-created_at',)
+        indexes = [
+            # Public listings: published adverts whose deadline has not passed, newest first
+            models.Index(
+                fields=['deadline', 'created_at'],
+                condition=models.Q(is_published=True),
+                name='jobadvert_published_idx',
+            ),
+        ]
 
     def publish_advert(self):
         self.is_published = True
@@ -30,7 +54,17 @@ class JobAdvert(BaseModel):
 
     @property
     def total_applicants(self):
-        return self.applications.count()
+        return self.applicant_count
+
+    @classmethod
+    def rebuild_applicant_counts(cls) -> int:
+        """
+        Recount every advert's applications in a single UPDATE, returning the rows touched.
+        """
+        counts = JobApplication.objects.filter(
+            job_advert=models.OuterRef('pk')
+        ).order_by().values('job_advert').annotate(total=models.Count('pk')).values('total')
+        return cls.objects.update(applicant_count=Coalesce(models.Subquery(counts), 0))
     
     def get_absolute_url(self):
         return reverse('get_advert', kwargs={'advert_id': self.id})
@@ -40,7 +74,40 @@ class JobApplication(BaseModel):
     name = models.CharField(max_length=50)
     email = models.EmailField()
     portfolio_url = models.URLField(blank=True, null=True)
-    resume = models.FileField()
+    resume = models.FileField(storage=get_resume_storage, db_index=True)
     status = models.CharField(max_length=50, choices=ApplicationStatus.choices, default=ApplicationStatus.APPLIED)
     job_advert = models.ForeignKey(JobAdvert, on_delete=models.CASCADE, related_name='applications')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['email'], name='jobapplication_email_idx'),
+            models.Index(fields=['job_advert', 'created_at'], name='jobapplication_advert_idx'),
+        ]
+
+
+
+class ResumeBlob(models.Model):
+    """
+    One stored resume file, shared by every application that uploaded the same bytes.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)  # Applications referring to it, counted in their transactions
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # Last reference taken or given back
+
+    def __str__(self):
+        return self.name
+
+
+class JobAdvertSearchDocument(models.Model):
+    advert = models.OneToOneField(JobAdvert, on_delete=models.CASCADE, related_name='search_document')
+    document = SearchDocumentField()
+
+
+class ResumeText(models.Model):
+    """
+    Text extracted from an application's resume, indexed for search within an advert.
+    """
+    application = models.OneToOneField(JobApplication, on_delete=models.CASCADE, related_name='resume_text')
+    document = SearchDocumentField()
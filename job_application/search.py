@@ -0,0 +1,261 @@
+"""
+Full-text search over job adverts and applicants' resumes.
+
+Each searchable row gets a companion document row holding the text to index.
+On SQLite an FTS5 table mirrors the document table through triggers, on
+PostgreSQL a GIN index over ``to_tsvector`` of the document column is used.
+Any other backend falls back to ``icontains`` matching.
+"""
+import re
+
+from django.db import connection, models
+from django.db.migrations.operations.base import Operation
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.http import urlencode
+
+from common.pagination import DEFAULT_ORDERING
+from job_application.skills import filter_by_skills, parse_skills
+
+SEARCH_CONFIG = 'english'
+
+FULL_TEXT_VENDORS = ('sqlite', 'postgresql')
+
+
+def search_terms(text: str) -> list[str]:
+    """
+    Split free text into lower-cased word tokens, dropping query syntax.
+    """
+    return re.findall(r'\w+', (text or '').lower())
+
+
+def build_search_query(text: str, vendor: str) -> str:
+    """
+    Build a prefix-matching query where every term must be present.
+    """
+    terms = search_terms(text)
+    if vendor == 'postgresql':
+        return ' & '.join(f'{term}:*' for term in terms)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def fts_table_name(model) -> str:
+    return f'{model._meta.db_table}_fts'
+
+
+def _row_id_sql(compiler, connection, col) -> str:
+    """
+    Qualified primary key column of the document table behind ``col``.
+    """
+    pk_column = col.target.model._meta.pk.column
+    return f'{compiler.quote_name_unless_alias(col.alias)}.{connection.ops.quote_name(pk_column)}'
+
+
+class SearchDocumentField(models.TextField):
+    """
+    Text column indexed for full-text search by ``CreateSearchIndex``.
+    """
+
+
+@SearchDocumentField.register_lookup
+class FullTextMatch(models.Lookup):
+    lookup_name = 'match'
+    prepare_rhs = False
+
+    def as_sqlite(self, compiler, connection):
+        fts_table = connection.ops.quote_name(fts_table_name(self.lhs.target.model))
+        row_id = _row_id_sql(compiler, connection, self.lhs)
+        query = build_search_query(self.rhs, connection.vendor)
+        return f'{row_id} IN (SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH %s)', [query]
+
+    def as_postgresql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        query = build_search_query(self.rhs, connection.vendor)
+        sql = f'to_tsvector(%s::regconfig, {lhs}) @@ to_tsquery(%s::regconfig, %s)'
+        return sql, [SEARCH_CONFIG, *lhs_params, SEARCH_CONFIG, query]
+
+
+class SearchRank(models.Func):
+    """
+    Relevance of a document against a query, higher is better.
+    """
+    output_field = models.FloatField()
+
+    def __init__(self, expression, query: str):
+        super().__init__(expression)
+        self.query = query
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        col = self.source_expressions[0]
+        fts_table = connection.ops.quote_name(fts_table_name(col.target.model))
+        row_id = _row_id_sql(compiler, connection, col)
+        query = build_search_query(self.query, connection.vendor)
+        # LIMIT -1 stops SQLite flattening the ranked matches into a correlated
+        # MATCH per row; the matches are materialised once and probed by rowid.
+        sql = (
+            f'(SELECT score FROM (SELECT rowid AS entry_id, -rank AS score FROM {fts_table} '
+            f'WHERE {fts_table} MATCH %s LIMIT -1) WHERE entry_id = {row_id})'
+        )
+        return sql, [query]
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        lhs, lhs_params = compiler.compile(self.source_expressions[0])
+        query = build_search_query(self.query, connection.vendor)
+        sql = f'ts_rank(to_tsvector(%s::regconfig, {lhs}), to_tsquery(%s::regconfig, %s))'
+        return sql, [SEARCH_CONFIG, *lhs_params, SEARCH_CONFIG, query]
+
+
+class CreateSearchIndex(Operation):
+    """
+    Create the full-text index for the ``document`` column of a model.
+    """
+    reversible = True
+
+    def __init__(self, model_name: str, field_name: str = 'document'):
+        self.model_name = model_name
+        self.field_name = field_name
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def _index_statements(self, model, schema_editor):
+        table = model._meta.db_table
+        column = model._meta.get_field(self.field_name).column
+        pk_column = model._meta.pk.column
+        fts_table = fts_table_name(model)
+        quote = schema_editor.quote_name
+
+        if schema_editor.connection.vendor == 'sqlite':
+            return [
+                f"CREATE VIRTUAL TABLE {quote(fts_table)} USING fts5("
+                f"{quote(column)}, content={quote(table)}, content_rowid={quote(pk_column)}, "
+                f"tokenize='porter unicode61')",
+                f"CREATE TRIGGER {quote(fts_table + '_ai')} AFTER INSERT ON {quote(table)} BEGIN "
+                f"INSERT INTO {quote(fts_table)}(rowid, {quote(column)}) "
+                f"VALUES (new.{quote(pk_column)}, new.{quote(column)}); END",
+                f"CREATE TRIGGER {quote(fts_table + '_ad')} AFTER DELETE ON {quote(table)} BEGIN "
+                f"INSERT INTO {quote(fts_table)}({quote(fts_table)}, rowid, {quote(column)}) "
+                f"VALUES ('delete', old.{quote(pk_column)}, old.{quote(column)}); END",
+                f"CREATE TRIGGER {quote(fts_table + '_au')} AFTER UPDATE ON {quote(table)} BEGIN "
+                f"INSERT INTO {quote(fts_table)}({quote(fts_table)}, rowid, {quote(column)}) "
+                f"VALUES ('delete', old.{quote(pk_column)}, old.{quote(column)}); "
+                f"INSERT INTO {quote(fts_table)}(rowid, {quote(column)}) "
+                f"VALUES (new.{quote(pk_column)}, new.{quote(column)}); END",
+                f"INSERT INTO {quote(fts_table)}({quote(fts_table)}) VALUES ('rebuild')",
+            ]
+        if schema_editor.connection.vendor == 'postgresql':
+            return [
+                f"CREATE INDEX {quote(fts_table)} ON {quote(table)} "
+                f"USING GIN (to_tsvector('{SEARCH_CONFIG}'::regconfig, {quote(column)}))",
+            ]
+        return []
+
+    def _drop_statements(self, model, schema_editor):
+        fts_table = fts_table_name(model)
+        quote = schema_editor.quote_name
+
+        if schema_editor.connection.vendor == 'sqlite':
+            return [
+                f"DROP TRIGGER IF EXISTS {quote(fts_table + suffix)}"
+                for suffix in ('_ai', '_ad', '_au')
+            ] + [f"DROP TABLE IF EXISTS {quote(fts_table)}"]
+        if schema_editor.connection.vendor == 'postgresql':
+            return [f"DROP INDEX IF EXISTS {quote(fts_table)}"]
+        return []
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            for statement in self._index_statements(model, schema_editor):
+                schema_editor.execute(statement, params=None)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            for statement in self._drop_statements(model, schema_editor):
+                schema_editor.execute(statement, params=None)
+
+    def describe(self):
+        return f'Create full-text search index on {self.model_name}.{self.field_name}'
+
+    @property
+    def migration_name_fragment(self):
+        return f'{self.model_name.lower()}_search_index'
+
+
+def advert_document(advert) -> str:
+    """
+    Text indexed for a job advert.
+    """
+    parts = (advert.title, advert.company_name, advert.skills, advert.description)
+    return '\n'.join(part for part in parts if part)
+
+
+def _search(queryset, keyword: str, document: str, fallback_fields: tuple[str, ...]):
+    """
+    Filter ``queryset`` to rows whose ``document`` matches ``keyword``, most relevant first.
+    """
+    if not search_terms(keyword):
+        return queryset
+
+    if connection.vendor not in FULL_TEXT_VENDORS:
+        condition = Q()
+        for field in fallback_fields:
+            condition |= Q(**{f'{field}__icontains': keyword})
+        return queryset.filter(condition)
+
+    return queryset.filter(
+        **{f'{document}__match': keyword}
+    ).annotate(
+        search_rank=SearchRank(F(document), keyword)
+    ).order_by('-search_rank', '-created_at')
+
+
+def search_adverts(queryset, keyword: str):
+    """
+    Filter adverts by keyword, most relevant first.
+    """
+    return _search(
+        queryset, keyword, 'search_document__document',
+        ('title', 'description', 'company_name', 'skills'),
+    )
+
+
+def search_applications(queryset, keyword: str):
+    """
+    Filter applications by keyword in their resume text, most relevant first.
+    """
+    return _search(queryset, keyword, 'resume_text__document', ('resume_text__document',))
+
+
+# The public search parameters, carried over to each page of results
+SEARCH_PARAMETERS = ('keyword', 'location', 'skills', 'skill_match')
+
+
+def search_query(params) -> str:
+    """
+    The search parameters in ``params`` as a query string, without paging or anything else.
+    """
+    return urlencode([(name, params[name]) for name in SEARCH_PARAMETERS if params.get(name)])
+
+
+def filter_adverts(queryset, params) -> tuple:
+    """
+    Apply the public search parameters (``keyword``, ``location``, ``skills`` and
+    ``skill_match``) to live adverts, returning the queryset and its paging order.
+    """
+    queryset = queryset.filter(is_published=True, deadline__gte=timezone.now().date())
+
+    location = params.get('location')
+    if location:
+        queryset = queryset.filter(location__icontains=location)
+
+    skills = params.get('skills')
+    if skills:
+        queryset = filter_by_skills(queryset, parse_skills(skills), params.get('skill_match') != 'any')
+
+    # Ranked by relevance when a keyword is given
+    queryset = search_adverts(queryset, params.get('keyword'))
+    if 'search_rank' in queryset.query.annotations:
+        return queryset, ('-search_rank', *DEFAULT_ORDERING)
+    return queryset, DEFAULT_ORDERING
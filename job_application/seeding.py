@@ -0,0 +1,283 @@
+"""
+Bulk generation of realistic users, adverts and applications for performance work.
+
+Rows are built directly, one faker-driven value per field, and written with
+``bulk_create`` a batch at a time. Every batch draws from its own faker seeded
+with ``(seed, kind, batch)``, and dates are offsets from an epoch chosen once
+per run, so the same seed and epoch give the same rows no matter how many
+worker processes share the batches. Signals don't fire for bulk inserts, so
+search documents, skill tags and applicant counts are written here as well.
+"""
+import multiprocessing
+import uuid
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.utils import timezone
+from faker import Faker
+
+from accounts.models import User
+from job_application.enums import EmploymentType, ExperienceLevel, LocationType
+from job_application.models import (
+    JobAdvert, JobAdvertSearchDocument, JobApplication, ResumeText, SkillTag,
+)
+from job_application.search import advert_document
+from job_application.skills import parse_skills
+from job_application.storage import resume_storage
+
+SKILL_POOL = (
+    'Python', 'Django', 'PostgreSQL', 'JavaScript', 'TypeScript', 'React', 'Go', 'Rust', 'Java',
+    'Kotlin', 'AWS', 'Docker', 'Kubernetes', 'Terraform', 'SQL', 'Excel', 'Figma', 'Sales',
+    'Marketing', 'Accounting', 'Customer Service', 'Project Management', 'Machine Learning',
+)
+
+# Every seeded user can sign in with this password
+SEEDED_PASSWORD = 'seeded-password'
+
+PLACEHOLDER_RESUME = 'seed/resume.pdf'
+
+# How far before the epoch accounts and adverts are spread
+USER_HISTORY = timedelta(days=730)
+ADVERT_HISTORY = timedelta(days=180)
+
+
+def seeded_email(number: int) -> str:
+    return f'seed.user{number}@example.com'
+
+
+def batch_faker(seed: int, kind: str, batch: int) -> Faker:
+    # Frequency-weighted picks (realistic name distributions) are several times slower
+    faker = Faker(use_weighting=False)
+    faker.seed_instance(f'{seed}:{kind}:{batch}')
+    return faker
+
+
+def _before(faker: Faker, moment: datetime, span: timedelta) -> datetime:
+    return moment - timedelta(seconds=faker.random_int(0, int(span.total_seconds())))
+
+
+def _backdate(model, objects: list, created_at: list[datetime], batch_size: int) -> None:
+    """
+    Give bulk-created rows their seeded creation times, which ``auto_now_add`` replaces on insert.
+    """
+    for obj, moment in zip(objects, created_at, strict=True):
+        obj.created_at = moment
+    model.objects.bulk_update(objects, ['created_at'], batch_size=batch_size)
+
+
+def placeholder_pdf(text: str) -> bytes:
+    """
+    A one-page PDF showing ``text``, small but readable by the resume text extractor.
+    """
+    escaped = text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    stream = f'BT /F1 12 Tf 72 720 Td ({escaped}) Tj ET'.encode()
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+        b'/Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>',
+        b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    pdf = b'%PDF-1.4\n'
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    xref = len(pdf)
+    pdf += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    pdf += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    pdf += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return pdf
+
+
+def _choice(faker: Faker, choices) -> str:
+    return faker.random_element(choices)[0]
+
+
+def build_advert(faker: Faker, employer: User, epoch: datetime) -> JobAdvert:
+    """
+    An advert posted in the ``ADVERT_HISTORY`` before ``epoch``, still open then.
+    """
+    return JobAdvert(
+        id=uuid.UUID(faker.uuid4()),
+        title=faker.job(),
+        company_name=faker.company(),
+        description=faker.paragraph(nb_sentences=8),
+        skills=', '.join(faker.random_elements(SKILL_POOL, length=4, unique=True)),
+        location=faker.city(),
+        experience_level=_choice(faker, ExperienceLevel),
+        employment_type=_choice(faker, EmploymentType),
+        job_type=_choice(faker, LocationType),
+        deadline=epoch.date() + timedelta(days=faker.random_int(1, 90)),
+        created_by=employer,
+        created_at=_before(faker, epoch, ADVERT_HISTORY),
+    )
+
+
+def build_application(faker: Faker, advert: JobAdvert, number: int, epoch: datetime,
+                      email: str | None = None) -> JobApplication:
+    """
+    An application sent between ``advert`` being posted and ``epoch``.
+    """
+    return JobApplication(
+        id=uuid.UUID(faker.uuid4()),
+        name=faker.name(),
+        email=email or f'applicant{number}@example.com',
+        portfolio_url=faker.url(),
+        resume=PLACEHOLDER_RESUME,
+        job_advert=advert,
+        created_at=_before(faker, epoch, epoch - advert.created_at),
+    )
+
+
+def _write_resumes(applications: list[JobApplication]):
+    """
+    Store a distinct placeholder PDF per application, returning their extracted text. Saving
+    takes each application's blob reference; the text comes from the application itself, so
+    the other rows don't depend on ``resumes``.
+    """
+    texts = []
+    for application in applications:
+        advert = application.job_advert
+        text = f'{application.name} {application.email} {advert.title} {advert.skills}'
+        content = placeholder_pdf(text)
+        application.resume = resume_storage.save('resume.pdf', ContentFile(content))
+        texts.append(ResumeText(application=application, document=text))
+    return texts
+
+
+def seed_adverts(faker: Faker, employers, count: int, applications_per_advert: int,
+                 batch_size: int = 1000, applicants: int | None = None, resumes: bool = False,
+                 rebuild_counts: bool = True, epoch: datetime | None = None) -> int:
+    """
+    Create ``count`` adverts spread over ``employers``, each with
+    ``applications_per_advert`` applications. Returns the applications created.
+
+    Applications come from made-up addresses, or when ``applicants`` is given from
+    the first ``applicants`` seeded users, no more than once per advert. Dates lead
+    up to ``epoch``, by default now. ``resumes`` writes a placeholder resume for each.
+    """
+    epoch = epoch or timezone.now()
+    SkillTag.objects.bulk_create(
+        [SkillTag(name=name) for name in parse_skills(', '.join(SKILL_POOL))], ignore_conflicts=True
+    )
+    tag_ids = dict(SkillTag.objects.values_list('name', 'id'))
+    SkillLink = JobAdvert.skill_tags.through
+
+    applications = 0
+    for start in range(0, count, batch_size):
+        adverts = [
+            build_advert(faker, employers[number % len(employers)], epoch)
+            for number in range(start, min(start + batch_size, count))
+        ]
+        batch = []
+        for advert in adverts:
+            if applicants is None:
+                emails = [None] * applications_per_advert
+            else:
+                picked = faker.random.sample(range(applicants), min(applications_per_advert, applicants))
+                emails = [seeded_email(number) for number in picked]
+            for email in emails:
+                batch.append(build_application(faker, advert, applications, epoch, email))
+                applications += 1
+
+        with transaction.atomic():
+            texts = _write_resumes(batch) if resumes else []
+            advert_dates = [advert.created_at for advert in adverts]
+            application_dates = [application.created_at for application in batch]
+            JobAdvert.objects.bulk_create(adverts)
+            _backdate(JobAdvert, adverts, advert_dates, batch_size)
+            JobAdvertSearchDocument.objects.bulk_create(
+                [JobAdvertSearchDocument(advert=advert, document=advert_document(advert)) for advert in adverts]
+            )
+            SkillLink.objects.bulk_create([
+                SkillLink(jobadvert_id=advert.id, skilltag_id=tag_ids[skill])
+                for advert in adverts
+                for skill in parse_skills(advert.skills)
+            ])
+            JobApplication.objects.bulk_create(batch, batch_size=batch_size)
+            _backdate(JobApplication, batch, application_dates, batch_size)
+            ResumeText.objects.bulk_create(texts, batch_size=batch_size)
+
+    if rebuild_counts:
+        JobAdvert.rebuild_applicant_counts()
+    return applications
+
+
+def _batch_range(batch: int, batch_size: int, total: int) -> range:
+    return range(batch * batch_size, min((batch + 1) * batch_size, total))
+
+
+def seed_user_batch(seed: int, batch: int, batch_size: int, total: int, password_hash: str,
+                    epoch: datetime) -> int:
+    faker = batch_faker(seed, 'users', batch)
+    users = [
+        User(id=uuid.UUID(faker.uuid4()), email=seeded_email(number), password=password_hash)
+        for number in _batch_range(batch, batch_size, total)
+    ]
+    joined = [_before(faker, epoch, USER_HISTORY) for _ in users]
+    with transaction.atomic():
+        User.objects.bulk_create(users)
+        _backdate(User, users, joined, batch_size)
+    return len(users)
+
+
+def seed_advert_batch(seed: int, batch: int, batch_size: int, total: int, employers: int, users: int,
+                      applications_per_advert: int, epoch: datetime, resumes: bool = False) -> int:
+    """
+    Create one batch of adverts with their applications, returning the applications created.
+    """
+    faker = batch_faker(seed, 'adverts', batch)
+    employer_emails = [seeded_email(number % employers) for number in _batch_range(batch, batch_size, total)]
+    employer_users = {
+        user.email: user for user in User.objects.filter(email__in=set(employer_emails)).only('id', 'email')
+    }
+    # Applicants are seeded users, so one person applies to many adverts
+    return seed_adverts(
+        faker, [employer_users[email] for email in employer_emails], len(employer_emails), applications_per_advert,
+        batch_size=batch_size, applicants=users, resumes=resumes, rebuild_counts=False, epoch=epoch,
+    )
+
+
+def _run(function, jobs: list[tuple], workers: int) -> list:
+    if workers <= 1:
+        return [function(*job) for job in jobs]
+
+    # Forked workers must open their own database connections
+    connections.close_all()
+    with multiprocessing.get_context('fork').Pool(workers) as pool:
+        return pool.starmap(function, jobs)
+
+
+def seed(seed: int, users: int, employers: int, adverts: int, applications_per_advert: int,
+         batch_size: int = 1000, workers: int = 1, resumes: bool = False, epoch: date | None = None,
+         progress=None) -> dict[str, int]:
+    """
+    Seed ``users`` users, the first ``employers`` of whom post ``adverts`` adverts
+    between them, each with ``applications_per_advert`` applications from seeded users.
+
+    Everything is dated in the run-up to midnight on ``epoch``, by default today,
+    and every advert is still open on that day.
+    """
+    employers = max(1, min(employers, users))
+    start = timezone.make_aware(datetime.combine(epoch or timezone.localdate(), time()))
+    report = progress or (lambda message: None)
+
+    # Hashing is deliberately slow, so every seeded user shares one hash
+    password_hash = make_password(SEEDED_PASSWORD)
+    user_batches = range((users + batch_size - 1) // batch_size)
+    report(f'Creating {users} users in {len(user_batches)} batches...')
+    _run(seed_user_batch, [(seed, batch, batch_size, users, password_hash, start) for batch in user_batches], workers)
+
+    advert_batches = range((adverts + batch_size - 1) // batch_size)
+    report(f'Creating {adverts} adverts in {len(advert_batches)} batches...')
+    applications = sum(_run(seed_advert_batch, [
+        (seed, batch, batch_size, adverts, employers, users, applications_per_advert, start, resumes)
+        for batch in advert_batches
+    ], workers))
+
+    JobAdvert.rebuild_applicant_counts()
+    return {'users': users, 'adverts': adverts, 'applications': applications}
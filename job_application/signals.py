@@ -0,0 +1,114 @@
+from django.core.files import File
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from job_application.cache import bump_advert_list_generation
+from job_application.models import JobAdvert, JobAdvertSearchDocument, JobApplication
+from job_application.search import advert_document
+from job_application.skills import sync_skill_tags
+
+SEARCHABLE_FIELDS = {'title', 'company_name', 'skills', 'description'}
+
+
+@receiver(post_save, sender=JobAdvert)
+def index_job_advert(sender, instance: JobAdvert, created: bool, update_fields=None, **kwargs):
+    """
+    Keep the advert's search document in step with its text fields.
+    Deleting an advert cascades to its document.
+    """
+    if update_fields and not SEARCHABLE_FIELDS.intersection(update_fields):
+        return
+
+    JobAdvertSearchDocument.objects.update_or_create(
+        advert=instance, defaults={'document': advert_document(instance)}
+    )
+
+
+@receiver(post_save, sender=JobAdvert)
+def tag_job_advert_skills(sender, instance: JobAdvert, created: bool, update_fields=None, **kwargs):
+    """
+    Re-parse the advert's skill tags whenever its skills text may have changed.
+    """
+    if update_fields and 'skills' not in update_fields:
+        return
+
+    sync_skill_tags(instance)
+
+
+@receiver(post_save, sender=JobApplication)
+def count_new_applicant(sender, instance: JobApplication, created: bool, **kwargs):
+    if created:
+        JobAdvert.objects.filter(pk=instance.job_advert_id).update(
+            applicant_count=F('applicant_count') + 1
+        )
+
+
+@receiver(post_delete, sender=JobApplication)
+def uncount_deleted_applicant(sender, instance: JobApplication, origin=None, **kwargs):
+    # Nothing to keep in step when the advert itself is being deleted
+    if isinstance(origin, JobAdvert) or getattr(origin, 'model', None) is JobAdvert:
+        return
+
+    JobAdvert.objects.filter(pk=instance.job_advert_id, applicant_count__gt=0).update(
+        applicant_count=F('applicant_count') - 1
+    )
+
+
+def _resume_name(value) -> str:
+    if isinstance(value, File):
+        return value.name or ''
+    return value or ''
+
+
+@receiver(post_init, sender=JobApplication)
+def remember_saved_resume(sender, instance: JobApplication, **kwargs):
+    # None when the field was deferred, so the stored name isn't known yet
+    stored = instance.__dict__.get('resume')
+    instance._saved_resume = _resume_name(stored) if 'resume' in instance.__dict__ else None
+
+
+@receiver(pre_save, sender=JobApplication)
+def load_saved_resume(sender, instance: JobApplication, update_fields=None, **kwargs):
+    # An upload not yet written gets its reference from the storage as it is saved
+    instance._resume_uploading = not instance.resume._committed
+    if instance._state.adding or instance._saved_resume is not None:
+        return
+    if update_fields is None or 'resume' in update_fields:
+        stored = sender.objects.filter(pk=instance.pk).values_list('resume', flat=True).first()
+        instance._saved_resume = stored or ''
+
+
+@receiver(post_save, sender=JobApplication)
+def move_resume_reference(sender, instance: JobApplication, created: bool, update_fields=None, **kwargs):
+    """
+    Take a reference on the application's resume blob, and give back the one on
+    the blob it replaces, in the same transaction as the row.
+    """
+    if update_fields is not None and 'resume' not in update_fields:
+        return
+
+    storage = instance.resume.storage
+    saved = '' if created else (instance._saved_resume or '')
+    current = instance.resume.name or ''
+    if current != saved:
+        if current and not instance._resume_uploading:
+            storage.retain(current)
+        if saved:
+            storage.release(saved)
+    instance._saved_resume = current
+
+
+@receiver(post_delete, sender=JobApplication)
+def release_resume(sender, instance: JobApplication, **kwargs):
+    """
+    Give back the application's reference on the resume blob it was stored with.
+    """
+    if instance._saved_resume:
+        instance.resume.storage.release(instance._saved_resume)
+
+
+@receiver(post_save, sender=JobAdvert)
+@receiver(post_delete, sender=JobAdvert)
+def invalidate_advert_list(sender, instance: JobAdvert, **kwargs):
+    bump_advert_list_generation()
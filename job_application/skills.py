@@ -0,0 +1,51 @@
+"""
+Normalised skill tags parsed from the free-text ``JobAdvert.skills`` field.
+"""
+import re
+
+from django.db.models import Count
+
+SKILL_MAX_LENGTH = 50
+
+
+def normalize_skill(skill: str) -> str:
+    """
+    Lower-case a skill and collapse its whitespace, e.g. " Machine  Learning" -> "machine learning".
+    """
+    return re.sub(r'\s+', ' ', skill).strip().lower()[:SKILL_MAX_LENGTH]
+
+
+def parse_skills(raw: str | None) -> list[str]:
+    """
+    Split a comma-separated skills string into unique normalised tags, keeping their order.
+    """
+    tags = (normalize_skill(skill) for skill in (raw or '').split(','))
+    return list(dict.fromkeys(tag for tag in tags if tag))
+
+
+def sync_skill_tags(advert) -> None:
+    """
+    Point the advert's tag links at the tags parsed from its ``skills`` text.
+    """
+    from job_application.models import SkillTag
+
+    names = parse_skills(advert.skills)
+    SkillTag.objects.bulk_create([SkillTag(name=name) for name in names], ignore_conflicts=True)
+    advert.skill_tags.set(SkillTag.objects.filter(name__in=names))
+
+
+def filter_by_skills(queryset, skills: list[str], match_all: bool = True):
+    """
+    Keep adverts tagged with all (or any) of the given skills.
+    """
+    names = list(dict.fromkeys(normalize_skill(skill) for skill in skills if skill.strip()))
+    if not names:
+        return queryset
+
+    links = queryset.model.skill_tags.through.objects.filter(skilltag__name__in=names)
+    if match_all:
+        links = links.values('jobadvert_id').annotate(
+            matched=Count('skilltag_id')
+        ).filter(matched=len(names))
+
+    return queryset.filter(id__in=links.values('jobadvert_id'))
@@ -0,0 +1,181 @@
+import hashlib
+import os
+import re
+from datetime import timedelta
+from functools import partial
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+RESUME_DIRECTORY = 'resumes'
+BLOB_NAME = re.compile(rf'^{RESUME_DIRECTORY}/[0-9a-f]{{2}}/[0-9a-f]{{2}}/[0-9a-f]{{64}}(\.\w+)?$')
+
+
+def content_digest(content) -> str:
+    """
+    SHA-256 of an uploaded file, reusing the digest taken while it was streamed in.
+    """
+    digest = getattr(content, 'sha256', None)
+    if digest:
+        return digest
+
+    sha256 = hashlib.sha256()
+    for chunk in content.chunks():
+        sha256.update(chunk)
+    content.seek(0)
+    return sha256.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File storage that keeps each distinct file once, named after its SHA-256.
+
+    Blobs live under ``resumes/ab/cd/<digest><ext>`` so no directory grows too
+    large. Each has a ``ResumeBlob`` row counting the applications pointing at
+    it. ``save`` takes a reference for the application being saved, in the same
+    transaction, and names assigned without uploading take theirs with
+    ``retain``; ``release`` gives one back. Every change to a row happens under
+    its lock, so the file is only removed once nothing refers to it and no
+    upload of the same bytes is under way.
+
+    Files and references left behind by uploads whose application was never
+    saved are swept up by ``collect`` once they are ``grace`` old.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('allow_overwrite', True)  # A blob name always means the same bytes
+        super().__init__(**kwargs)
+
+    @staticmethod
+    def blob_name(digest: str, name: str) -> str:
+        extension = os.path.splitext(name)[1].lower()
+        return f'{RESUME_DIRECTORY}/{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+    @staticmethod
+    def is_blob(name: str) -> bool:
+        return bool(BLOB_NAME.match(name or ''))
+
+    def save(self, name, content, max_length=None):
+        from job_application.models import ResumeBlob
+
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.blob_name(content_digest(content), name or content.name)
+        with transaction.atomic():
+            blob, created = ResumeBlob.objects.select_for_update().get_or_create(
+                name=name, defaults={'size': content.size}
+            )
+            # A new row may find the file of a rolled back upload; writing it again keeps it from being swept
+            if created or not self.exists(name):
+                name = super().save(name, content, max_length)
+            ResumeBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1, updated_at=timezone.now())
+        return name
+
+    def retain(self, name: str) -> None:
+        """
+        Take a reference to a blob whose name was assigned without uploading it.
+        Names saved before content addressing aren't tracked.
+        """
+        from job_application.models import ResumeBlob
+
+        if not self.is_blob(name):
+            return
+        with transaction.atomic():
+            blob, _ = ResumeBlob.objects.select_for_update().get_or_create(
+                name=name, defaults={'size': self.size(name)}
+            )
+            ResumeBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1, updated_at=timezone.now())
+
+    def release(self, name: str) -> bool:
+        """
+        Drop one reference to a blob, removing the file once the last one is gone.
+        Returns False if ``name`` is not a blob this storage is tracking.
+        """
+        from job_application.models import ResumeBlob
+
+        with transaction.atomic():
+            blob = ResumeBlob.objects.select_for_update().filter(name=name).first()
+            if blob is None:
+                return False
+            ResumeBlob.objects.filter(pk=blob.pk).update(
+                ref_count=Greatest(F('ref_count') - 1, 0), updated_at=timezone.now()
+            )
+        if blob.ref_count <= 1:
+            transaction.on_commit(partial(self._remove_unreferenced, name))
+        return True
+
+    def _remove_unreferenced(self, name: str) -> bool:
+        from job_application.models import ResumeBlob
+
+        with transaction.atomic():
+            # Uploads of the same bytes since the release wait on this lock, then write the file again
+            blob = ResumeBlob.objects.select_for_update().filter(name=name, ref_count=0).first()
+            if blob is None:
+                return False
+            blob.delete()
+            super().delete(name)
+        return True
+
+    def collect(self, grace: timedelta) -> dict[str, int]:
+        """
+        Remove what uploads that never became an application left behind, once
+        it is ``grace`` old: blob files without a row, and references with no
+        application behind them. Returns the counts of each.
+        """
+        from job_application.models import JobApplication, ResumeBlob
+
+        cutoff = timezone.now() - grace
+        corrected = 0
+        for name in ResumeBlob.objects.filter(updated_at__lt=cutoff).values_list('name', flat=True).iterator():
+            with transaction.atomic():
+                blob = ResumeBlob.objects.select_for_update().filter(name=name, updated_at__lt=cutoff).first()
+                if blob is None:
+                    continue
+                references = JobApplication.objects.filter(resume=name).count()
+                if references != blob.ref_count:
+                    ResumeBlob.objects.filter(pk=blob.pk).update(ref_count=references, updated_at=timezone.now())
+                    corrected += 1
+            if references == 0:
+                self._remove_unreferenced(name)
+
+        orphans = 0
+        for name in self._blob_files():
+            if self.get_modified_time(name) >= cutoff or ResumeBlob.objects.filter(name=name).exists():
+                continue
+            with transaction.atomic():
+                # Holding a row for the name keeps an upload of the same bytes from writing it meanwhile
+                blob, created = ResumeBlob.objects.select_for_update().get_or_create(
+                    name=name, defaults={'size': self.size(name)}
+                )
+                if created:
+                    blob.delete()
+                    if self.get_modified_time(name) < cutoff:
+                        super().delete(name)
+                        orphans += 1
+        return {'references': corrected, 'orphaned_files': orphans}
+
+    def _blob_files(self):
+        if not self.exists(RESUME_DIRECTORY):
+            return
+        for first in self.listdir(RESUME_DIRECTORY)[0]:
+            for second in self.listdir(f'{RESUME_DIRECTORY}/{first}')[0]:
+                directory = f'{RESUME_DIRECTORY}/{first}/{second}'
+                for name in self.listdir(directory)[1]:
+                    if self.is_blob(f'{directory}/{name}'):
+                        yield f'{directory}/{name}'
+
+    def delete(self, name):
+        # Blobs go when their last reference is released, not when one user deletes them
+        if not self.is_blob(name):
+            super().delete(name)  # A file saved before content addressing
+
+
+resume_storage = ContentAddressedStorage()
+
+
+def get_resume_storage() -> ContentAddressedStorage:
+    return resume_storage
@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+
+from job_application.extraction import extract_text
+from job_application.models import JobApplication, ResumeText
+from job_application.storage import resume_storage
+
+
+@shared_task(autoretry_for=(OSError,), retry_backoff=True, max_retries=3)
+def extract_resume_text(application_id):
+    """
+    Extract and index the text of an application's resume.
+
+    Queue it with ``extract_resume_text.delay_on_commit(application.id)`` once the
+    application is saved. Resumes are stored once per content, so text already
+    extracted for another application with the same file is reused.
+    """
+    application = JobApplication.objects.only('id', 'resume').filter(pk=application_id).first()
+    if application is None or not application.resume:
+        return
+
+    text = ResumeText.objects.filter(
+        application__resume=application.resume.name
+    ).values_list('document', flat=True).first()
+    if text is None:
+        with application.resume.open('rb') as resume:
+            text = extract_text(resume)
+
+    ResumeText.objects.update_or_create(application=application, defaults={'document': text})
+
+
+@shared_task
+def collect_resume_blobs() -> dict[str, int]:
+    """
+    Remove resume files and references left by uploads that never became an application.
+
+    Scheduled by Celery beat through ``CELERY_BEAT_SCHEDULE``; run
+    ``manage.py collect_resume_blobs`` instead where beat isn't running.
+    """
+    return resume_storage.collect(timedelta(seconds=settings.RESUME_BLOB_GRACE_PERIOD))
@@ -0,0 +1,91 @@
+import pytest
+from datetime import timedelta
+from django.urls import reverse
+from django.utils import timezone
+
+from job_application.tests.factories import JobAdvertFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_advert_list_pages_with_cursors(client, user_instance, django_assert_num_queries):
+    """
+    Test that the list returns live adverts only, newest first, one page per cursor.
+    """
+    deadline = timezone.now() + timedelta(days=7)
+    adverts = [JobAdvertFactory(created_by=user_instance, deadline=deadline) for _ in range(3)]
+    JobAdvertFactory(created_by=user_instance, deadline=deadline, is_published=False)
+    url = reverse('api_v1:advert_list')
+
+    with django_assert_num_queries(1):
+        response = client.get(url, {"limit": 2})
+    assert response.status_code == 200
+    body = response.json()
+    assert [advert["id"] for advert in body["results"]] == [str(adverts[2].id), str(adverts[1].id)]
+    assert body["results"][0]["url"].endswith(adverts[2].get_absolute_url())
+    assert body["previous"] is None
+
+    body = client.get(body["next"]).json()
+    assert [advert["id"] for advert in body["results"]] == [str(adverts[0].id)]
+    assert body["next"] is None
+
+
+def test_advert_list_not_modified(client, user_instance, django_assert_num_queries, monkeypatch):
+    """
+    Test that a repeat request answers 304 without a query until an advert changes.
+    """
+    # The tests' local-memory cache stands in for the shared one
+    monkeypatch.setattr('job_application.api.advert_list_generation_is_shared', lambda: True)
+    advert = JobAdvertFactory(created_by=user_instance, deadline=timezone.now() + timedelta(days=7))
+    url = reverse('api_v1:advert_list')
+    etag = client.get(url)["ETag"]
+
+    with django_assert_num_queries(0):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+
+    advert.title = "Changed"
+    advert.save()
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+def test_advert_list_without_shared_cache_has_no_etag(client, user_instance):
+    """
+    Test that listings carry no ETag when the generation is local to each process.
+    """
+    JobAdvertFactory(created_by=user_instance, deadline=timezone.now() + timedelta(days=7))
+    response = client.get(reverse('api_v1:advert_list'))
+    assert response.status_code == 200
+    assert not response.has_header("ETag")
+
+
+def test_advert_search_reuses_search_filters(client, user_instance):
+    """
+    Test that the search endpoint applies the same filters and ranking as the search page.
+    """
+    deadline = timezone.now() + timedelta(days=7)
+    match = JobAdvertFactory(created_by=user_instance, deadline=deadline, title="Django developer", location="Lagos")
+    JobAdvertFactory(created_by=user_instance, deadline=deadline, title="Django developer", location="Accra")
+    JobAdvertFactory(created_by=user_instance, deadline=deadline, title="Accountant", location="Lagos", skills="Excel")
+
+    response = client.get(reverse('api_v1:advert_search'), {"keyword": "django", "location": "lagos"})
+    assert [advert["id"] for advert in response.json()["results"]] == [str(match.id)]
+
+
+def test_advert_detail(client, user_instance):
+    """
+    Test the detail endpoint, its ETag and that unpublished adverts are not found.
+    """
+    advert = JobAdvertFactory(created_by=user_instance, deadline=timezone.now() + timedelta(days=7))
+    url = reverse('api_v1:advert_detail', kwargs={'advert_id': advert.id})
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.json()["description"] == advert.description
+    assert client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code == 304
+
+    advert.is_published = False
+    advert.save()
+    response = client.get(url)
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Not found."}
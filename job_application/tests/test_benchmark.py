@@ -0,0 +1,117 @@
+import io
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+from faker import Faker
+
+from accounts.models import User
+from job_application.benchmark import Result, Scenarios, load_baseline, regressions, run_benchmark, save_baseline
+from job_application.extraction import extract_text
+from job_application.models import JobAdvert, JobApplication, ResumeBlob
+from job_application.seeding import seed, seed_adverts, seeded_email
+
+pytestmark = pytest.mark.django_db
+
+
+def test_seed():
+    """
+    Test that seeding writes users, adverts with their search documents, skill tags and counts, and applications.
+    """
+    assert seed(0, users=4, employers=2, adverts=5, applications_per_advert=3, batch_size=2) == {
+        'users': 4, 'adverts': 5, 'applications': 15,
+    }
+    assert User.objects.count() == 4
+    assert set(JobAdvert.objects.values_list('created_by__email', flat=True)) == {seeded_email(0), seeded_email(1)}
+    assert not JobAdvert.objects.filter(search_document__isnull=True).exists()
+    assert not JobAdvert.objects.filter(skill_tags__isnull=True).exists()
+    assert set(JobAdvert.objects.values_list('applicant_count', flat=True)) == {3}
+    assert JobApplication.objects.filter(email__in=User.objects.values('email')).count() == 15
+
+
+def test_seed_is_deterministic():
+    """
+    Test that the same seed gives the same rows.
+    """
+    def snapshot():
+        return (
+            sorted(User.objects.values_list('id', 'email', 'created_at')),
+            sorted(JobAdvert.objects.values_list('id', 'title', 'skills', 'created_by', 'created_at', 'deadline')),
+            sorted(JobApplication.objects.values_list('id', 'name', 'email', 'job_advert', 'created_at')),
+        )
+
+    seed(7, users=5, employers=2, adverts=6, applications_per_advert=2, batch_size=4, epoch=date(2025, 3, 1))
+    first = snapshot()
+    User.objects.all().delete()
+    seed(7, users=5, employers=2, adverts=6, applications_per_advert=2, batch_size=4, epoch=date(2025, 3, 1))
+    assert snapshot() == first
+
+
+def test_seed_dates_lead_up_to_epoch():
+    """
+    Test that seeded rows are spread over the time before the epoch, with adverts open on it.
+    """
+    seed(0, users=20, employers=2, adverts=10, applications_per_advert=2, epoch=date(2025, 3, 1))
+    epoch = timezone.make_aware(datetime(2025, 3, 1))
+
+    for model in (User, JobAdvert, JobApplication):
+        created = list(model.objects.values_list('created_at', flat=True))
+        assert all(epoch - timedelta(days=730) <= moment <= epoch for moment in created)
+        assert len(set(created)) == len(created)
+    assert JobAdvert.objects.filter(deadline__gt=epoch.date()).count() == 10
+    for application in JobApplication.objects.select_related('job_advert'):
+        assert application.job_advert.created_at <= application.created_at
+
+
+def test_seed_data_command_writes_resumes():
+    """
+    Test that the command can write a readable placeholder resume, tracked as a blob, for every application.
+    """
+    call_command('seed_data', users=3, employers=1, adverts=2, applications=2, resumes=True, stdout=io.StringIO())
+
+    applications = JobApplication.objects.select_related('resume_text')
+    assert applications.count() == 4
+    assert ResumeBlob.objects.filter(name__in=applications.values('resume'), ref_count=1).count() == 4
+    for application in applications:
+        with application.resume.open('rb') as resume:
+            assert extract_text(resume) == application.resume_text.document
+
+
+def test_seed_adverts_for_existing_employers(user_instance):
+    """
+    Test that adverts can still be seeded for given employers, with made-up applicants.
+    """
+    assert seed_adverts(Faker(), [user_instance], count=3, applications_per_advert=2, batch_size=2) == 6
+    assert set(JobAdvert.objects.values_list('applicant_count', flat=True)) == {2}
+    assert JobApplication.objects.filter(email__startswith='applicant').count() == 6
+
+
+def test_seed_data_refuses_workers_on_sqlite():
+    """
+    Test that several worker processes are refused on SQLite, which allows one writer at a time.
+    """
+    with pytest.raises(CommandError, match="--workers"):
+        call_command('seed_data', users=2, adverts=1, workers=2, stdout=io.StringIO())
+
+
+def test_run_benchmark_reports_every_page(client, tmp_path):
+    """
+    Test that every page is timed and that a saved baseline is compared against.
+    """
+    seed(0, users=5, employers=1, adverts=10, applications_per_advert=2)
+    employer = User.objects.get(email=seeded_email(0))
+    client.force_login(employer)
+
+    results = run_benchmark(client, Scenarios(random.Random(0), employer), requests=3, warmup=1)
+    assert set(results) == set(Scenarios.names)
+    assert all(result.p50 <= result.p95 <= result.p99 for result in results.values())
+
+    baseline_path = tmp_path / "baseline.json"
+    save_baseline(baseline_path, results)
+    baseline = load_baseline(baseline_path)
+    assert regressions(results, baseline, tolerance=0.1) == []
+
+    slower = {**results, 'my_jobs': Result(p50=1e6, p95=1e6, p99=1e6, queries=results['my_jobs'].queries + 1)}
+    assert len(regressions(slower, baseline, tolerance=0.1)) == 2
@@ -0,0 +1,42 @@
+import io
+import zipfile
+
+import pytest
+
+from job_application.extraction import extract_text
+from job_application.seeding import placeholder_pdf
+
+
+def make_docx(*paragraphs: str) -> bytes:
+    body = ''.join(f'<w:p><w:r><w:t>{text}</w:t></w:r></w:p>' for text in paragraphs)
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f'<w:body>{body}</w:body></w:document>'
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('word/document.xml', document)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("content, expected", [
+    (placeholder_pdf("Senior Django developer"), "Senior Django developer"),
+    (make_docx("Jane Doe", "Kubernetes   and Go"), "Jane Doe\nKubernetes and Go"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1 legacy word file", ""),
+    (b"%PDF-1.4 truncated", ""),
+    (b"PK\x03\x04 not really a zip", ""),
+])
+def test_extract_text(content, expected):
+    """
+    Test that PDF and DOCX text is extracted and unsupported or broken files give no text.
+    """
+    assert extract_text(io.BytesIO(content)) == expected
+
+
+def test_extract_text_skips_oversized_docx(monkeypatch):
+    """
+    Test that a DOCX whose document expands past the cap is not parsed.
+    """
+    monkeypatch.setattr('job_application.extraction.MAX_DOCUMENT_XML_SIZE', 200)
+    assert extract_text(io.BytesIO(make_docx("x" * 500))) == ""
@@ -1,22 +1,36 @@
+import base64
+import hashlib
+import html
+import io
+import json
+import re
+import zipfile
 import pytest
+from io import StringIO
 from accounts.models import User
 from accounts.tests.factories import UserFactory
 from .factories import JobAdvertFactory, JobApplicationFactory,fake
-from django.test.client import Client
+from .test_extraction import make_docx
+from asgiref.sync import async_to_sync
+from django.test.client import AsyncClient, Client
 from django.urls import reverse
 from job_application.models import JobAdvert, JobApplication
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.contrib.messages import get_messages
 from job_application.enums import ApplicationStatus
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 
 
 pytestmark = pytest.mark.django_db
 
-def test_list_adverts(client: Client, user_instance):
+def test_list_adverts(authenticate_user):
     """
     Test the list of job adverts.
     """
+    client, user_instance = authenticate_user
     JobAdvertFactory.create_batch(20, created_by=user_instance, deadline=fake.future_date())
     JobAdvertFactory.create_batch(5, created_by=user_instance, deadline=fake.past_date())
     url = reverse('home')
@@ -25,8 +39,14 @@ def test_list_adverts(client: Client, user_instance):
     assert "job_adverts" in response.context
 
     paginated_adverts = response.context['job_adverts']
-    assert paginated_adverts.paginator.count == 20
     assert len(paginated_adverts.object_list) == 10  # Assuming default pagination of 10 per page
+    assert paginated_adverts.has_next()
+
+    response = client.get(url, {'cursor': paginated_adverts.next_cursor})
+    next_page = response.context['job_adverts']
+    assert len(next_page.object_list) == 10
+    assert not next_page.has_next()
+    assert not set(next_page.object_list) & set(paginated_adverts.object_list)
 
 
 def test_create_advert(authenticate_user):
@@ -143,7 +163,7 @@ def test_apply_for_job(client, user_instance):
     advert = JobAdvertFactory(created_by=user_instance)
     url = reverse('apply', kwargs={'advert_id': advert.id})
 
-    resume_file = SimpleUploadedFile("resume.pdf", b"PDF content")
+    resume_file = SimpleUploadedFile("resume.pdf", b"%PDF-1.4 content")
 
     request_data = {
         "name": "John Doe",
@@ -173,7 +193,7 @@ def test_apply_for_job_using_duplicate_email(client, user_instance):
     advert = JobAdvertFactory(created_by=user_instance)
     url = reverse('apply', kwargs={'advert_id': advert.id})
 
-    resume_file = SimpleUploadedFile("resume.pdf", b"PDF content")
+    resume_file = SimpleUploadedFile("resume.pdf", b"%PDF-1.4 content")
 
     # First application
     request_data = {
@@ -205,7 +225,7 @@ def test_apply_for_job_using_duplicate_email(client, user_instance):
     application = JobApplicationFactory(job_advert=advert, email="john.doe@example.com")
     url = reverse('apply', kwargs={'advert_id': advert.id})
 
-    resume_file = SimpleUploadedFile("resume.pdf", b"PDF content")
+    resume_file = SimpleUploadedFile("resume.pdf", b"%PDF-1.4 content")
 
     # First application
     request_data = {
@@ -300,4 +320,458 @@ def test_get_applicants_for_an_advert(authenticate_user):
     response = client.get(url)
     assert response.status_code == 200
     assert "applications" in response.context
-    assert len(response.context['applications'].object_list) == 3
\ No newline at end of file
+    assert len(response.context['applications'].object_list) == 3
+
+def test_search_adverts_ranked_by_relevance(authenticate_user):
+    """
+    Test that keyword search matches whole words and ranks the closest adverts first.
+    """
+    client, user_instance = authenticate_user
+    deadline = fake.future_date()
+    JobAdvertFactory(created_by=user_instance, deadline=deadline, title="Accountant",
+                     description="Keep the books", skills="Excel")
+    python_mention = JobAdvertFactory(created_by=user_instance, deadline=deadline, title="Backend Engineer",
+                                      description="Some Python scripting", skills="Go")
+    python_focus = JobAdvertFactory(created_by=user_instance, deadline=deadline, title="Python Developer",
+                                    description="Python services and Python tooling", skills="Python")
+
+    response = client.get(reverse('search'), {'keyword': 'python'})
+    assert response.status_code == 200
+    adverts = list(response.context['job_adverts'].object_list)
+    assert adverts == [python_focus, python_mention]
+
+
+def test_search_pages_keep_search_parameters(authenticate_user):
+    """
+    Test that the next page of a search is still filtered by it, without unrelated parameters.
+    """
+    client, user_instance = authenticate_user
+    deadline = fake.future_date()
+    JobAdvertFactory.create_batch(11, created_by=user_instance, deadline=deadline, title="Python Developer")
+    JobAdvertFactory.create_batch(3, created_by=user_instance, deadline=deadline, title="Chef",
+                                  description="Cook", skills="Cooking")
+
+    response = client.get(reverse('search'), {'keyword': 'python', 'location': '', 'utm_source': 'mail'})
+    next_link = re.search(r'href="(\?[^"]*)">Next', response.content.decode()).group(1)
+    next_link = html.unescape(next_link)
+    assert next_link.startswith("?keyword=python&cursor=")
+
+    response = client.get(reverse('search') + next_link)
+    adverts = list(response.context['job_adverts'].object_list)
+    assert [advert.title for advert in adverts] == ["Python Developer"]
+
+
+def test_search_ignores_tampered_rank_in_cursor(authenticate_user):
+    """
+    Test that a cursor with a search rank that is not a number gives the first page of results.
+    """
+    client, user_instance = authenticate_user
+    JobAdvertFactory.create_batch(2, created_by=user_instance, deadline=fake.future_date(),
+                                  title="Python Developer")
+    position = {"p": ["abc", "2024-01-01T00:00:00+00:00", 1], "r": False}
+    cursor = base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip("=")
+
+    response = client.get(reverse('search'), {'keyword': 'python', 'cursor': cursor})
+    assert response.status_code == 200
+    assert len(response.context['job_adverts']) == 2
+
+    response = client.get(reverse('api_v1:advert_search'), {'keyword': 'python', 'cursor': cursor})
+    assert response.status_code == 200
+    assert len(response.json()['results']) == 2
+
+
+def test_search_index_follows_advert_changes(authenticate_user):
+    """
+    Test that the search index is updated when an advert is edited or deleted.
+    """
+    client, user_instance = authenticate_user
+    advert = JobAdvertFactory(created_by=user_instance, deadline=fake.future_date(),
+                              title="Data Analyst", skills="SQL")
+    url = reverse('search')
+
+    advert.title = "Rust Engineer"
+    advert.save()
+    assert len(client.get(url, {'keyword': 'analyst'}).context['job_adverts'].object_list) == 0
+    assert len(client.get(url, {'keyword': 'rust'}).context['job_adverts'].object_list) == 1
+
+    advert.delete()
+    assert len(client.get(url, {'keyword': 'rust'}).context['job_adverts'].object_list) == 0
+
+
+def test_search_adverts_by_skill_tags(authenticate_user):
+    """
+    Test filtering adverts by normalised skill tags with all/any matching.
+    """
+    client, user_instance = authenticate_user
+    deadline = fake.future_date()
+    java = JobAdvertFactory(created_by=user_instance, deadline=deadline, skills="Java, Spring")
+    javascript = JobAdvertFactory(created_by=user_instance, deadline=deadline, skills="JavaScript,  react ")
+    both = JobAdvertFactory(created_by=user_instance, deadline=deadline, skills="java,React")
+    url = reverse('search')
+
+    response = client.get(url, {'skills': 'JAVA'})
+    assert set(response.context['job_adverts'].object_list) == {java, both}
+
+    response = client.get(url, {'skills': 'java, react'})
+    assert list(response.context['job_adverts'].object_list) == [both]
+
+    response = client.get(url, {'skills': 'spring, react', 'skill_match': 'any'})
+    assert set(response.context['job_adverts'].object_list) == {java, javascript, both}
+
+    assert sorted(javascript.skill_tags.values_list('name', flat=True)) == ['javascript', 'react']
+
+
+def test_bulk_decide_applications(authenticate_user, mailoutbox, django_capture_on_commit_callbacks):
+    """
+    Test rejecting several applications at once notifies every rejected applicant.
+    """
+    client, user = authenticate_user
+    advert = JobAdvertFactory(created_by=user)
+    pending = [
+        JobApplicationFactory(job_advert=advert, email=f"applicant{n}@example.com") for n in range(3)
+    ]
+    decided = JobApplicationFactory(job_advert=advert, email="decided@example.com",
+                                    status=ApplicationStatus.INTERVIEW_SCHEDULED)
+    url = reverse('bulk_decide', kwargs={'advert_id': advert.id})
+    request_data = {
+        "status": ApplicationStatus.REJECTED,
+        "application_ids": [application.id for application in pending] + [decided.id],
+    }
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post(url, request_data)
+
+    assert response.status_code == 302
+    assert response.url == reverse('advert_applications', kwargs={'advert_id': advert.id})
+    assert advert.applications.filter(status=ApplicationStatus.REJECTED).count() == 3
+    decided.refresh_from_db()
+    assert decided.status == ApplicationStatus.INTERVIEW_SCHEDULED  # Already decided, left alone
+
+    assert sorted(message.to[0] for message in mailoutbox) == [application.email for application in pending]
+
+    message = list(get_messages(response.wsgi_request))
+    assert "3 applications updated to REJECTED." in message[0].message
+
+
+def test_bulk_decide_applications_unauthorized_user(authenticate_user):
+    """
+    Test that only the advert owner can decide applications in bulk.
+    """
+    client, user = authenticate_user
+    advert = JobAdvertFactory(created_by=UserFactory())
+    application = JobApplicationFactory(job_advert=advert, email="john.doe@example.com")
+    url = reverse('bulk_decide', kwargs={'advert_id': advert.id})
+
+    response = client.post(url, {"status": ApplicationStatus.REJECTED, "application_ids": [application.id]})
+    assert response.status_code == 403
+    application.refresh_from_db()
+    assert application.status == ApplicationStatus.APPLIED
+
+
+def test_applicant_count_follows_applications(client: Client, user_instance):
+    """
+    Test that applying and deleting applications keeps the advert's applicant count in step.
+    """
+    advert = JobAdvertFactory(created_by=user_instance)
+    url = reverse('apply', kwargs={'advert_id': advert.id})
+    client.post(url, {
+        "name": "John Doe",
+        "email": "john.doe@example.com",
+        "portfolio_url": "",
+        "resume": SimpleUploadedFile("resume.pdf", b"%PDF-1.4 content"),
+    })
+    other = JobApplicationFactory(job_advert=advert, email="jane.doe@example.com")
+
+    advert.refresh_from_db()
+    assert advert.total_applicants == 2
+
+    other.delete()
+    advert.refresh_from_db()
+    assert advert.total_applicants == 1
+
+    JobAdvert.objects.filter(pk=advert.pk).update(applicant_count=7)
+    call_command('rebuild_applicant_counts', stdout=StringIO())
+    advert.refresh_from_db()
+    assert advert.total_applicants == 1
+
+    advert.applications.get().resume.delete(save=False)  # Clean up the uploaded file after test
+
+
+def test_my_jobs_query_count_is_constant(authenticate_user):
+    """
+    Test that the employer dashboard does not run a query per advert.
+    """
+    client, user = authenticate_user
+    url = reverse('my_jobs')
+    for advert in JobAdvertFactory.create_batch(2, created_by=user):
+        JobApplicationFactory.create_batch(2, job_advert=advert, email="john.doe@example.com")
+
+    with CaptureQueriesContext(connection) as few_adverts:
+        client.get(url)
+
+    for advert in JobAdvertFactory.create_batch(6, created_by=user):
+        JobApplicationFactory.create_batch(2, job_advert=advert, email="john.doe@example.com")
+
+    with CaptureQueriesContext(connection) as many_adverts:
+        response = client.get(url)
+
+    assert len(many_adverts) == len(few_adverts)
+    assert "<td>2</td>" in response.content.decode()
+
+
+def test_list_adverts_served_from_cache_until_adverts_change(authenticate_user, django_assert_max_num_queries):
+    """
+    Test that the home page list is cached and refreshed once an advert is saved.
+    """
+    client, user = authenticate_user
+    advert = JobAdvertFactory(created_by=user, deadline=fake.future_date(), title="Original Title")
+    url = reverse('home')
+    assert "Original Title" in client.get(url).content.decode()
+
+    with django_assert_max_num_queries(2):  # Session and user only
+        assert "Original Title" in client.get(url).content.decode()
+
+    advert.title = "Changed Title"
+    advert.save()
+    assert "Changed Title" in client.get(url).content.decode()
+
+
+def test_list_adverts_cached_links_ignore_other_query_parameters(authenticate_user):
+    """
+    Test that parameters on the request that filled the cache don't leak into the page links served to others.
+    """
+    client, user = authenticate_user
+    JobAdvertFactory.create_batch(11, created_by=user, deadline=fake.future_date())
+    url = reverse('home')
+
+    assert "utm_source" not in client.get(url, {'utm_source': 'campaign'}).content.decode()
+    assert 'href="?cursor=' in client.get(url).content.decode()
+
+
+def test_list_adverts_skips_queries_for_anonymous_users(client: Client, user_instance, django_assert_num_queries):
+    """
+    Test that anonymous visitors, who are not shown the list, cost no advert queries.
+    """
+    JobAdvertFactory(created_by=user_instance, deadline=fake.future_date())
+
+    with django_assert_num_queries(0):
+        response = client.get(reverse('home'))
+    assert response.status_code == 200
+    assert "job-card" not in response.content.decode()
+
+
+def test_retrieve_job_advert_conditional_get(client: Client, user_instance, django_assert_num_queries):
+    """
+    Test that a repeat view of an unchanged advert is answered with 304 Not Modified.
+    """
+    advert = JobAdvertFactory(created_by=user_instance)
+    url = reverse('get_advert', kwargs={'advert_id': advert.id})
+
+    client.get(url)  # The first view hands out the CSRF cookie the page is tied to
+    response = client.get(url)
+    assert response.status_code == 200
+    assert "private" in response.headers['Cache-Control']
+    etag = response.headers['ETag']
+
+    with django_assert_num_queries(1):  # Only the updated_at lookup
+        response = client.get(url, headers={'if-none-match': etag})
+    assert response.status_code == 304
+
+    advert.title = "Updated Title"
+    advert.save()
+    response = client.get(url, headers={'if-none-match': etag})
+    assert response.status_code == 200
+    assert "Updated Title" in response.content.decode()
+
+
+@pytest.mark.parametrize("content, error", [
+    (b"MZ\x90\x00 not a resume", "Resume must be a PDF, DOC or DOCX file."),
+    (b"%PDF-1.4 " + b"x" * 2048, "Resume must be smaller than 1.0\xa0KB."),
+])
+def test_apply_for_job_rejects_bad_resume(client, user_instance, settings, content, error):
+    """
+    Test that wrong-type and oversized resumes are rejected while streaming.
+    """
+    settings.RESUME_MAX_UPLOAD_SIZE = 1024
+    advert = JobAdvertFactory(created_by=user_instance)
+    url = reverse('apply', kwargs={'advert_id': advert.id})
+
+    request_data = {
+        "name": "John Doe",
+        "email": "john.doe@example.com",
+        "portfolio_url": "",
+        "resume": SimpleUploadedFile("resume.pdf", content),
+    }
+    response = client.post(url, request_data)
+    assert response.status_code == 302
+    assert response.url == reverse('get_advert', kwargs={'advert_id': advert.id})
+
+    messages = list(get_messages(response.wsgi_request))
+    assert len(messages) == 1
+    assert messages[0].level_tag == 'error'
+    assert messages[0].message == error
+    assert not JobApplication.objects.exists()
+
+
+def test_apply_for_job_hashes_resume(client, user_instance):
+    """
+    Test that the upload handler records the SHA-256 of the streamed resume.
+    """
+    advert = JobAdvertFactory(created_by=user_instance)
+    url = reverse('apply', kwargs={'advert_id': advert.id})
+    content = b"%PDF-1.4 resume body"
+
+    response = client.post(url, {
+        "name": "John Doe",
+        "email": "john.doe@example.com",
+        "portfolio_url": "",
+        "resume": SimpleUploadedFile("resume.pdf", content),
+    })
+    assert response.status_code == 302
+    assert response.wsgi_request.FILES['resume'].sha256 == hashlib.sha256(content).hexdigest()
+
+    JobApplication.objects.get().resume.delete(save=False)  # Clean up the uploaded file after test
+
+
+def test_advert_applications_search_resume_text(authenticate_user, django_capture_on_commit_callbacks):
+    """
+    Test that resumes are indexed after applying and searchable within their advert only.
+    """
+    client, user = authenticate_user
+    advert, other_advert = JobAdvertFactory.create_batch(2, created_by=user)
+    resumes = {
+        "django@example.com": (advert, make_docx("Backend engineer", "Django and PostgreSQL")),
+        "rails@example.com": (advert, make_docx("Backend engineer", "Ruby on Rails")),
+        "elsewhere@example.com": (other_advert, make_docx("Django developer")),
+    }
+    for email, (job_advert, content) in resumes.items():
+        with django_capture_on_commit_callbacks(execute=True):
+            client.post(reverse('apply', kwargs={'advert_id': job_advert.id}), {
+                "name": "Applicant",
+                "email": email,
+                "portfolio_url": "",
+                "resume": SimpleUploadedFile("resume.docx", content),
+            })
+
+    url = reverse('advert_applications', kwargs={'advert_id': advert.id})
+    response = client.get(url, {"keyword": "djan"})
+    assert response.status_code == 200
+    assert [application.email for application in response.context['applications']] == ["django@example.com"]
+
+    response = client.get(url, {"keyword": "backend"})
+    assert len(response.context['applications']) == 2
+
+
+def test_advert_resumes_streams_zip(authenticate_user):
+    """
+    Test that the advert owner can download every resume as one streamed ZIP.
+    """
+    client, user = authenticate_user
+    advert = JobAdvertFactory(created_by=user, title='Développeur "Django"')
+    resumes = {"ann@example.com": b"%PDF-1.4 ann", "bob@example.com": b"%PDF-1.4 bob"}
+    for email, content in resumes.items():
+        client.post(reverse('apply', kwargs={'advert_id': advert.id}), {
+            "name": email.split("@")[0],
+            "email": email,
+            "portfolio_url": "",
+            "resume": SimpleUploadedFile("resume.pdf", content),
+        })
+
+    response = client.get(reverse('advert_resumes', kwargs={'advert_id': advert.id}))
+    assert response.status_code == 200
+    assert response.streaming
+    assert response['Content-Type'] == 'application/zip'
+    assert response['Content-Disposition'] == (
+        "attachment; filename*=utf-8''D%C3%A9veloppeur%20%22Django%22_resumes.zip"
+    )
+
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+    assert archive.testzip() is None
+    contents = {name.split("_")[0]: archive.read(name) for name in archive.namelist()}
+    assert contents == {"ann": resumes["ann@example.com"], "bob": resumes["bob@example.com"]}
+
+
+def test_advert_resumes_unauthorized(authenticate_user):
+    """
+    Test that only the advert owner can download its resumes.
+    """
+    client, _ = authenticate_user
+    advert = JobAdvertFactory(created_by=UserFactory())
+
+    response = client.get(reverse('advert_resumes', kwargs={'advert_id': advert.id}))
+    assert response.status_code == 403
+
+
+def test_export_advert_applications(authenticate_user, django_assert_max_num_queries):
+    """
+    Test that an advert's applications stream out as CSV and JSONL.
+    """
+    client, user = authenticate_user
+    advert = JobAdvertFactory(created_by=user, title="Ingénieur; logiciel")
+    JobApplicationFactory(job_advert=advert, name="=HYPERLINK()", email="ann@example.com")
+    JobApplicationFactory(job_advert=advert, email="bob@example.com")
+    JobApplicationFactory(job_advert=JobAdvertFactory(created_by=UserFactory()), email="other@example.com")
+    url = reverse('export_advert_applications', kwargs={'advert_id': advert.id})
+
+    with django_assert_max_num_queries(4):
+        response = client.get(url, {"format": "csv"})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+    assert response['Content-Type'] == 'text/csv'
+    assert response['Content-Disposition'] == (
+        "attachment; filename*=utf-8''Ing%C3%A9nieur%3B%20logiciel_applications.csv"
+    )
+    assert lines[0] == "id,advert_id,advert_title,name,email,portfolio_url,status,applied_at"
+    assert len(lines) == 3
+    assert "'=HYPERLINK()" in lines[1]
+
+    response = client.get(url, {"format": "jsonl"})
+    rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+    assert [row["email"] for row in rows] == ["ann@example.com", "bob@example.com"]
+    assert rows[0]["advert_id"] == str(advert.id)
+
+    assert client.get(url, {"format": "xml"}).status_code == 400
+
+
+def test_export_streams_asynchronously_under_asgi(user_instance):
+    """
+    Test that under ASGI the export is streamed from an async iterator rather than read into a list first.
+    """
+    advert = JobAdvertFactory(created_by=user_instance)
+    JobApplicationFactory(job_advert=advert, email="ann@example.com")
+    url = reverse('export_advert_applications', kwargs={'advert_id': advert.id})
+
+    async def export():
+        client = AsyncClient()
+        await client.aforce_login(user_instance)
+        response = await client.get(url, {"format": "jsonl"})
+        return response, b"".join([chunk async for chunk in response.streaming_content])
+
+    response, content = async_to_sync(export)()
+    assert response.is_async
+    assert [json.loads(line)["email"] for line in content.splitlines()] == ["ann@example.com"]
+
+
+def test_export_my_applications(authenticate_user):
+    """
+    Test that an employer's export covers all of their adverts and nobody else's.
+    """
+    client, user = authenticate_user
+    for advert in JobAdvertFactory.create_batch(2, created_by=user):
+        JobApplicationFactory(job_advert=advert, email=f"{advert.id}@example.com")
+    JobApplicationFactory(job_advert=JobAdvertFactory(created_by=UserFactory()), email="other@example.com")
+
+    response = client.get(reverse('export_my_applications'), {"format": "jsonl"})
+    rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+    assert len(rows) == 2
+    assert "other@example.com" not in {row["email"] for row in rows}
+
+
+def test_export_advert_applications_unauthorized(authenticate_user):
+    """
+    Test that only the advert owner can export its applications.
+    """
+    client, _ = authenticate_user
+    advert = JobAdvertFactory(created_by=UserFactory())
+
+    response = client.get(reverse('export_advert_applications', kwargs={'advert_id': advert.id}))
+    assert response.status_code == 403
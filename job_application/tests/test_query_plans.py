@@ -0,0 +1,46 @@
+import uuid
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from common.pagination import DEFAULT_ORDERING
+from job_application.models import JobAdvert, JobApplication
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def prefer_indexes(db):
+    """
+    Stop PostgreSQL picking a sequential scan just because the test tables are empty.
+    """
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+
+def test_active_adverts_use_published_index():
+    """
+    Test that the public listing query is served by the partial published-advert index.
+    """
+    queryset = JobAdvert.objects.filter(
+        is_published=True, deadline__gte=timezone.now().date()
+    ).order_by(*DEFAULT_ORDERING)
+    assert "jobadvert_published_idx" in queryset.explain()
+
+
+def test_my_applications_use_email_index():
+    """
+    Test that looking up an applicant's applications by email uses its index.
+    """
+    queryset = JobApplication.objects.filter(email="john.doe@example.com").order_by(*DEFAULT_ORDERING)
+    assert "jobapplication_email_idx" in queryset.explain()
+
+
+def test_advert_applications_use_advert_index():
+    """
+    Test that an advert's applications are read through the (job_advert, created_at) index.
+    """
+    queryset = JobApplication.objects.filter(job_advert_id=uuid.uuid4()).order_by(*DEFAULT_ORDERING)
+    assert "jobapplication_advert_idx" in queryset.explain()
@@ -0,0 +1,184 @@
+import hashlib
+
+import pytest
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+
+from job_application.models import JobApplication, ResumeBlob
+from job_application.storage import resume_storage
+from job_application.tests.factories import JobAdvertFactory, JobApplicationFactory
+
+pytestmark = pytest.mark.django_db
+
+CONTENT = b"%PDF-1.4 the same resume"
+DIGEST = hashlib.sha256(CONTENT).hexdigest()
+
+
+def apply_with_resume(client, advert, email, filename="resume.pdf"):
+    url = reverse('apply', kwargs={'advert_id': advert.id})
+    return client.post(url, {
+        "name": "John Doe",
+        "email": email,
+        "portfolio_url": "",
+        "resume": SimpleUploadedFile(filename, CONTENT),
+    })
+
+
+def test_identical_resumes_share_one_blob(client, user_instance, django_capture_on_commit_callbacks):
+    """
+    Test that applying to several jobs with the same file stores it once, under its hash.
+    """
+    adverts = JobAdvertFactory.create_batch(3, created_by=user_instance)
+    with django_capture_on_commit_callbacks(execute=True):
+        for index, advert in enumerate(adverts):
+            apply_with_resume(client, advert, "john.doe@example.com", filename=f"cv_{index}.PDF")
+
+    names = set(JobApplication.objects.values_list('resume', flat=True))
+    assert names == {f"resumes/{DIGEST[:2]}/{DIGEST[2:4]}/{DIGEST}.pdf"}
+
+    blob = ResumeBlob.objects.get()
+    assert blob.ref_count == 3
+    assert blob.size == len(CONTENT)
+    assert resume_storage.exists(blob.name)
+
+
+def test_blob_removed_with_last_reference(client, user_instance, django_capture_on_commit_callbacks):
+    """
+    Test that deleting an application keeps a shared blob until nothing refers to it.
+    """
+    adverts = JobAdvertFactory.create_batch(2, created_by=user_instance)
+    with django_capture_on_commit_callbacks(execute=True):
+        for advert in adverts:
+            apply_with_resume(client, advert, "john.doe@example.com")
+    first, second = JobApplication.objects.all()
+    name = first.resume.name
+
+    with django_capture_on_commit_callbacks(execute=True):
+        first.delete()
+    assert ResumeBlob.objects.get().ref_count == 1
+    assert resume_storage.exists(name)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        second.delete()
+    assert not ResumeBlob.objects.exists()
+    assert not resume_storage.exists(name)
+
+
+def test_rolled_back_application_takes_no_reference(user_instance, django_capture_on_commit_callbacks):
+    """
+    Test that an application whose insert is rolled back leaves no reference behind.
+    """
+    advert = JobAdvertFactory(created_by=user_instance)
+    with django_capture_on_commit_callbacks(execute=True):
+        with pytest.raises(RuntimeError), transaction.atomic():
+            JobApplicationFactory(job_advert=advert, resume=ContentFile(CONTENT, name="resume.pdf"))
+            raise RuntimeError
+
+    assert not JobApplication.objects.exists()
+    assert not ResumeBlob.objects.exists()
+
+
+def test_replacing_resume_releases_old_blob(user_instance, django_capture_on_commit_callbacks):
+    """
+    Test that saving an application with a new resume gives back the old blob.
+    """
+    advert = JobAdvertFactory(created_by=user_instance)
+    with django_capture_on_commit_callbacks(execute=True):
+        application = JobApplicationFactory(job_advert=advert, resume=ContentFile(CONTENT, name="resume.pdf"))
+    old_name = application.resume.name
+
+    with django_capture_on_commit_callbacks(execute=True):
+        application.resume = ContentFile(b"%PDF-1.4 a newer resume", name="resume.pdf")
+        application.save()
+
+    blob = ResumeBlob.objects.get()
+    assert blob.name == application.resume.name != old_name
+    assert blob.ref_count == 1
+    assert not resume_storage.exists(old_name)
+
+
+def test_deleting_resume_then_application_releases_once(user_instance, django_capture_on_commit_callbacks):
+    """
+    Test that clearing the file and then deleting the row only gives back one reference.
+    """
+    adverts = JobAdvertFactory.create_batch(2, created_by=user_instance)
+    with django_capture_on_commit_callbacks(execute=True):
+        first, _ = [
+            JobApplicationFactory(job_advert=advert, resume=ContentFile(CONTENT, name="resume.pdf"))
+            for advert in adverts
+        ]
+    name = first.resume.name
+
+    with django_capture_on_commit_callbacks(execute=True):
+        first.resume.delete()
+        JobApplication.objects.get(pk=first.pk).delete()
+
+    assert ResumeBlob.objects.get().ref_count == 1
+    assert resume_storage.exists(name)
+
+
+def test_upload_during_release_keeps_blob(client, user_instance, django_capture_on_commit_callbacks):
+    """
+    Test that the same bytes uploaded between the last release and its commit keep the file.
+    """
+    first_advert, second_advert = JobAdvertFactory.create_batch(2, created_by=user_instance)
+    with django_capture_on_commit_callbacks(execute=True):
+        apply_with_resume(client, first_advert, "john.doe@example.com")
+    application = JobApplication.objects.get()
+    name = application.resume.name
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        application.delete()
+    apply_with_resume(client, second_advert, "jane.doe@example.com")
+    for callback in callbacks:
+        callback()
+
+    assert ResumeBlob.objects.get().ref_count == 1
+    assert resume_storage.exists(name)
+    assert JobApplication.objects.get().resume.name == name
+
+
+def test_collect_resume_blobs_removes_abandoned_uploads(user_instance, settings):
+    """
+    Test that files of rolled back applications and references nothing holds are collected.
+    """
+    advert = JobAdvertFactory(created_by=user_instance)
+    with pytest.raises(RuntimeError), transaction.atomic():
+        rolled_back = JobApplicationFactory(job_advert=advert, resume=ContentFile(CONTENT, name="resume.pdf"))
+        raise RuntimeError
+    abandoned = resume_storage.save("resume.pdf", ContentFile(b"%PDF-1.4 never applied with"))
+    kept = JobApplicationFactory(job_advert=advert, resume=ContentFile(b"%PDF-1.4 kept", name="resume.pdf"))
+    assert resume_storage.exists(rolled_back.resume.name)
+    assert ResumeBlob.objects.get(name=abandoned).ref_count == 1
+
+    settings.RESUME_BLOB_GRACE_PERIOD = 0
+    call_command('collect_resume_blobs')
+
+    assert not resume_storage.exists(rolled_back.resume.name)
+    assert not resume_storage.exists(abandoned)
+    assert ResumeBlob.objects.get().name == kept.resume.name
+    assert ResumeBlob.objects.get().ref_count == 1
+    assert resume_storage.exists(kept.resume.name)
+
+
+def test_dedupe_resumes_moves_legacy_files(user_instance):
+    """
+    Test that resumes saved under their upload name are folded into shared blobs.
+    """
+    advert = JobAdvertFactory(created_by=user_instance)
+    legacy = [
+        resume_storage._save(name, ContentFile(CONTENT))  # Bypass blob accounting, as before
+        for name in ("michaelcv.pdf", "michaelcv_OU8Pop0.pdf")
+    ]
+    for index, name in enumerate(legacy):
+        JobApplicationFactory(job_advert=advert, email=f"applicant{index}@example.com", resume=name)
+
+    call_command('dedupe_resumes')
+
+    blob = ResumeBlob.objects.get()
+    assert blob.ref_count == 2
+    assert set(JobApplication.objects.values_list('resume', flat=True)) == {blob.name}
+    assert not any(resume_storage.exists(name) for name in legacy)
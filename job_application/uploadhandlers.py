@@ -0,0 +1,52 @@
+import hashlib
+
+from django.conf import settings
+from django.core.files.uploadhandler import StopUpload, TemporaryFileUploadHandler
+from django.template.defaultfilters import filesizeformat
+
+# Leading bytes of the resume formats we accept
+RESUME_SIGNATURES = (
+    b"%PDF-",  # PDF
+    b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1",  # DOC (OLE2 compound file)
+    b"PK\x03\x04",  # DOCX (zip container)
+)
+
+
+class ResumeUploadHandler(TemporaryFileUploadHandler):
+    """
+    Stream a resume to a temporary file while hashing it, and stop reading the
+    request as soon as the upload is too large or is not a PDF/DOC/DOCX.
+
+    The SHA-256 of a completed upload is available as ``file.sha256``. When an
+    upload is rejected, ``error`` explains why and the file is left out of
+    ``request.FILES``.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.max_size = settings.RESUME_MAX_UPLOAD_SIZE
+        self.error = None
+
+    def reject(self, error: str):
+        self.error = error
+        raise StopUpload(connection_reset=True)
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        if content_length and content_length > self.max_size:
+            self.reject(f"Resume must be smaller than {filesizeformat(self.max_size)}.")
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        self.sha256 = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        if start == 0 and not raw_data.startswith(RESUME_SIGNATURES):
+            self.reject("Resume must be a PDF, DOC or DOCX file.")
+        if start + len(raw_data) > self.max_size:
+            self.reject(f"Resume must be smaller than {filesizeformat(self.max_size)}.")
+
+        self.sha256.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        file.sha256 = self.sha256.hexdigest()
+        return file
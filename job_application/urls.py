@@ -10,7 +10,11 @@ urlpatterns = [
     path("<uuid:advert_id>/update/", views.update_advert, name="update_advert"),
     path("<uuid:advert_id>/delete/", views.delete_advert, name="delete_advert"),
     path("<uuid:advert_id>/applications/", views.advert_applications, name="advert_applications"),
+    path("<uuid:advert_id>/applications/decide/", views.bulk_decide, name="bulk_decide"),
+    path("<uuid:advert_id>/applications/resumes.zip", views.advert_resumes, name="advert_resumes"),
+    path("<uuid:advert_id>/applications/export/", views.export_advert_applications, name="export_advert_applications"),
     path("<uuid:application_id>/decide/", views.decide, name="decide"),
     path("my_applications/", views.my_application, name="my_applications"),
     path("my_jobs/", views.my_jobs, name="my_jobs"),
+    path("my_jobs/applications/export/", views.export_my_applications, name="export_my_applications"),
 ]
\ No newline at end of file
@@ -1,16 +1,33 @@
+import hashlib
+import os
+from datetime import datetime
+from django.conf import settings
 from django.shortcuts import render
+from django.template.loader import render_to_string
 from accounts.models import User
 from job_application.enums import ApplicationStatus
-from job_application.forms import JobAdvertForm, JobApplicationForm
-from django.http import HttpRequest, HttpResponseForbidden
+from job_application.forms import BulkDecisionForm, JobAdvertForm, JobApplicationForm
+from django.http import HttpRequest, HttpResponseBadRequest, HttpResponseForbidden, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.cache import cache_control
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.decorators.http import condition, require_POST
+from django.views.decorators.vary import vary_on_cookie
+from django.db import transaction
+from job_application.cache import aget_or_render_advert_list
 from job_application.models import JobAdvert, JobApplication
+from job_application.search import filter_adverts, search_applications, search_query
+from job_application.tasks import extract_resume_text
+from job_application.uploadhandlers import ResumeUploadHandler
 from django.contrib import messages
-from django.shortcuts import get_object_or_404, redirect
+from django.shortcuts import aget_object_or_404, get_object_or_404, redirect
 from django.utils import timezone
-from django.db.models import Q
-from common.tasks import send_verification_email
-from django.core.paginator import Paginator
+from django.utils.http import content_disposition_header
+from django.utils.text import get_valid_filename
+from common.tasks import send_bulk_notification, send_verification_email
+from common.pagination import DEFAULT_ORDERING, CursorPaginator
+from common.querybudget import query_budget
+from common.streaming import stream_csv, stream_jsonl, stream_zip, streaming_content
 
 # Create your views here.
 @login_required
@@ -32,10 +49,60 @@ def create_advert(request: HttpRequest):
     }
     return render(request, "create_advert.html", context)
 
-def get_advert(request: HttpRequest, advert_id: int):
+def _advert_updated_at(request: HttpRequest, advert_id) -> datetime | None:
+    """
+    Fetch only the advert's ``updated_at``, once per request.
+    """
+    if not hasattr(request, "_advert_updated_at"):
+        request._advert_updated_at = JobAdvert.objects.filter(pk=advert_id).values_list(
+            "updated_at", flat=True
+        ).first()
+    return request._advert_updated_at
+
+
+def _advert_etag(request: HttpRequest, advert_id) -> str | None:
+    updated_at = _advert_updated_at(request, advert_id)
+    # Queued messages are rendered into the page, so never let the browser reuse a copy
+    if updated_at is None or len(messages.get_messages(request)):
+        return None
+
+    # The page carries the header for this user and a token tied to their CSRF cookie
+    csrf_cookie = request.COOKIES.get(settings.CSRF_COOKIE_NAME, "")
+    version = f"{advert_id}:{updated_at.isoformat()}:{request.user.pk}:{csrf_cookie}"
+    return hashlib.sha256(version.encode()).hexdigest()
+
+
+def _advert_last_modified(request: HttpRequest, advert_id) -> datetime | None:
+    if _advert_etag(request, advert_id) is None:
+        return None
+    return _advert_updated_at(request, advert_id)
+
+
+async def _load_user(request: HttpRequest) -> User:
+    """
+    Resolve the user, and with it the session, through the async ORM so that
+    templates can read ``user`` and ``messages`` without a sync query.
+    """
+    request.user = await request.auser()
+    return request.user
+
+
+@query_budget(5)
+@cache_control(private=True, no_cache=True)
+@vary_on_cookie
+async def get_advert(request: HttpRequest, advert_id: int):
+    await _load_user(request)
+    request._advert_updated_at = await JobAdvert.objects.filter(pk=advert_id).values_list(
+        "updated_at", flat=True
+    ).afirst()
+    return await _render_advert(request, advert_id)
+
+
+@condition(etag_func=_advert_etag, last_modified_func=_advert_last_modified)
+async def _render_advert(request: HttpRequest, advert_id: int):
     form = JobApplicationForm()
 
-    job_advert = get_object_or_404(JobAdvert, pk=advert_id)
+    job_advert = await aget_object_or_404(JobAdvert, pk=advert_id)
     context = {
         "job_advert": job_advert,
         "application_form": form,
@@ -43,17 +110,23 @@ def get_advert(request: HttpRequest, advert_id: int):
     return render(request, "advert.html", context)
 
 
-def list_adverts(request: HttpRequest):
-    active_adverts = JobAdvert.objects.filter(is_published=True, deadline__gte=timezone.now().date())
+@query_budget(5)
+async def list_adverts(request: HttpRequest):
+    context = {}
 
-    paginator = Paginator(active_adverts, 10)  # Show 10 adverts per page
-    requested_page = request.GET.get('page')
-    adverts = paginator.get_page(requested_page)
-    print(adverts.next_page_number, adverts.previous_page_number, adverts.has_previous)
+    # The list is only shown to signed-in users, so skip the queries for everyone else
+    user = await _load_user(request)
+    if user.is_authenticated:
+        requested_cursor = request.GET.get('cursor')
 
-    context = {
-        "job_adverts": adverts,
-    }
+        async def render_advert_list():
+            active_adverts = JobAdvert.objects.filter(is_published=True, deadline__gte=timezone.now().date())
+            paginator = CursorPaginator(active_adverts, 10)  # Show 10 adverts per page
+            adverts = await paginator.aget_page(requested_cursor)
+            await paginator.acount()
+            return render_to_string("advert_list.html", {"job_adverts": adverts}, request)
+
+        context["advert_list"] = await aget_or_render_advert_list(requested_cursor, render_advert_list)
 
     return render(request, "home.html", context)
 
@@ -89,11 +162,25 @@ def delete_advert(request: HttpRequest, advert_id: int):
     return redirect('my_jobs')
 
 
+@csrf_exempt
 def apply(request: HttpRequest, advert_id: int):
+    # The upload handler has to be in place before anything reads the body,
+    # including the CSRF check, which _apply does instead.
+    request.upload_handlers = [ResumeUploadHandler(request)]
+    return _apply(request, advert_id)
+
+
+@csrf_protect
+def _apply(request: HttpRequest, advert_id: int):
     job_advert = get_object_or_404(JobAdvert, pk=advert_id)
 
     if request.method == "POST":
         form = JobApplicationForm(request.POST, request.FILES)
+        upload_error = request.upload_handlers[0].error
+        if upload_error:
+            messages.error(request, upload_error)
+            return redirect(job_advert.get_absolute_url())
+
         if form.is_valid():
             email = form.cleaned_data.get("email")
             if job_advert.applications.filter(email=email).exists():
@@ -104,6 +191,8 @@ def apply(request: HttpRequest, advert_id: int):
             application: JobApplication = form.save(commit=False)  # type: ignore
             application.job_advert = job_advert
             application.save()
+            # Index the resume text in the background for the employer's search
+            extract_resume_text.delay_on_commit(application.id)
 
             messages.success(request, "Application submitted successfully.")
             return redirect(job_advert.get_absolute_url())
@@ -116,14 +205,15 @@ def apply(request: HttpRequest, advert_id: int):
     }
     return render(request, "advert.html", context)
 
+@query_budget(4)
 @login_required
 def my_application(request: HttpRequest):
     user: User = request.user
-    applications = JobApplication.objects.filter(email=user.email)
-    paginator = Paginator(applications, 10)  # Show 10 applications per page
+    applications = JobApplication.objects.filter(email=user.email).select_related('job_advert')
+    paginator = CursorPaginator(applications, 10)  # Show 10 applications per page
 
-    requested_page = request.GET.get('page')
-    paginated_applications = paginator.get_page(requested_page)
+    requested_cursor = request.GET.get('cursor')
+    paginated_applications = paginator.get_page(requested_cursor)
 
     context = {
         "my_applications": paginated_applications,
@@ -131,14 +221,15 @@ def my_application(request: HttpRequest):
     return render(request, "my_applications.html", context)
 
 
+@query_budget(4)
 @login_required
 def my_jobs(request: HttpRequest):
     user: User = request.user
     job_adverts = JobAdvert.objects.filter(created_by=user)
-    paginator = Paginator(job_adverts, 10)  # Show 10 adverts per page
+    paginator = CursorPaginator(job_adverts, 10)  # Show 10 adverts per page
 
-    requested_page = request.GET.get('page')
-    paginated_adverts = paginator.get_page(requested_page)
+    requested_cursor = request.GET.get('cursor')
+    paginated_adverts = paginator.get_page(requested_cursor)
 
     context = {
         "my_jobs": paginated_adverts,
@@ -146,28 +237,118 @@ def my_jobs(request: HttpRequest):
     }
     return render(request, "my_jobs.html", context)
 
+@query_budget(6)
 @login_required
 def advert_applications(request: HttpRequest, advert_id: int):
     Advert: JobAdvert = get_object_or_404(JobAdvert, pk=advert_id)
     if request.user != Advert.created_by:
         return HttpResponseForbidden("You do not have permission to view these applications.")
 
-    applications = Advert.applications.all()
+    keyword = request.GET.get("keyword")
+    applications = search_applications(Advert.applications.all(), keyword)
     # applications = JobApplication.objects.filter(job_advert=Advert.id)
-    paginator = Paginator(applications, 10)  # Show 10 applications per page
-    requested_page = request.GET.get('page')
-    paginated_applications = paginator.get_page(requested_page)
+    ordering = ('-search_rank', *DEFAULT_ORDERING) if 'search_rank' in applications.query.annotations else DEFAULT_ORDERING
+    paginator = CursorPaginator(applications, 10, ordering)  # Show 10 applications per page
+    requested_cursor = request.GET.get('cursor')
+    paginated_applications = paginator.get_page(requested_cursor)
 
     context = {
         "job_advert": Advert,
         "applications": paginated_applications,
+        "keyword": keyword,
+        "bulk_decision_form": BulkDecisionForm(),
     }
     return render(request, "advert_applications.html", context)
 
+def _resume_entries(applications):
+    for application in applications:
+        try:
+            resume = application.resume.open('rb')
+        except FileNotFoundError:
+            continue  # Leave out files that have gone missing rather than failing the whole download
+        extension = os.path.splitext(application.resume.name)[1]
+        name = get_valid_filename(f"{application.name}_{application.id}{extension}")
+        with resume:
+            yield name, application.created_at, resume.chunks()
+
+
+@login_required
+def advert_resumes(request: HttpRequest, advert_id: int):
+    job_advert: JobAdvert = get_object_or_404(
+        JobAdvert.objects.only("id", "title", "created_by_id"), pk=advert_id
+    )
+    if request.user.pk != job_advert.created_by_id:
+        return HttpResponseForbidden("You do not have permission to download these resumes.")
+
+    applications = job_advert.applications.exclude(resume="").only(
+        "id", "name", "resume", "created_at"
+    ).order_by("created_at", "id").iterator(chunk_size=500)
+
+    # Chunks are up to 64 KB, so pull only a few at a time
+    content = streaming_content(request, stream_zip(_resume_entries(applications)), batch_size=8)
+    response = StreamingHttpResponse(content, content_type="application/zip")
+    response["Content-Disposition"] = content_disposition_header(True, f"{job_advert.title}_resumes.zip")
+    return response
+
+
+# Columns of an applications export, and the fields they are read from
+EXPORT_COLUMNS = {
+    "id": "id",
+    "advert_id": "job_advert_id",
+    "advert_title": "job_advert__title",
+    "name": "name",
+    "email": "email",
+    "portfolio_url": "portfolio_url",
+    "status": "status",
+    "applied_at": "created_at",
+}
+
+EXPORT_FORMATS = {
+    "csv": (stream_csv, "text/csv"),
+    "jsonl": (stream_jsonl, "application/jsonl"),
+}
+
+
+def _export_response(request: HttpRequest, applications, filename: str):
+    export_format = request.GET.get("format", "csv")
+    if export_format not in EXPORT_FORMATS:
+        return HttpResponseBadRequest("Export format must be csv or jsonl.")
+
+    stream, content_type = EXPORT_FORMATS[export_format]
+    rows = applications.order_by("job_advert_id", "created_at", "id").values_list(
+        *EXPORT_COLUMNS.values()
+    ).iterator(chunk_size=2000)
+
+    content = streaming_content(request, stream(list(EXPORT_COLUMNS), rows), batch_size=500)
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response["Content-Disposition"] = content_disposition_header(True, f"{filename}.{export_format}")
+    return response
+
+
+@login_required
+def export_advert_applications(request: HttpRequest, advert_id: int):
+    job_advert: JobAdvert = get_object_or_404(
+        JobAdvert.objects.only("id", "title", "created_by_id"), pk=advert_id
+    )
+    if request.user.pk != job_advert.created_by_id:
+        return HttpResponseForbidden("You do not have permission to export these applications.")
+
+    return _export_response(request, job_advert.applications.all(), f"{job_advert.title}_applications")
+
+
+@login_required
+def export_my_applications(request: HttpRequest):
+    applications = JobApplication.objects.filter(job_advert__created_by=request.user)
+    return _export_response(request, applications, "applications")
+
+
+@query_budget(6)
 @login_required
 def decide(request: HttpRequest, application_id: int):
-    application: JobApplication = get_object_or_404(JobApplication, pk=application_id)
-    if request.user != application.job_advert.created_by:
+    application: JobApplication = get_object_or_404(
+        JobApplication.objects.select_related('job_advert'), pk=application_id
+    )
+    if request.user.pk != application.job_advert.created_by_id:
         return HttpResponseForbidden("You do not have permission to change the status of this application.")
     if request.method == "POST":
         status = request.POST.get("status")
@@ -182,40 +363,79 @@ def decide(request: HttpRequest, application_id: int):
                 "job_title": application.job_advert.title,
                 "company_name": application.job_advert.company_name,
             }
-            send_verification_email(
+            send_verification_email.delay_on_commit(
                 f"Application outcome for {application.job_advert.title}",
                 [application.email],
                 "emails/job_application_update.html",
                 context
             )
         return redirect('advert_applications', advert_id=application.job_advert.id)
-    
 
-def search(request: HttpRequest):
-    keyword = request.GET.get("keyword")
-    location = request.GET.get("location")
 
-    query = Q()
-    
-    if keyword:
-        query &= (
-            Q(title__icontains=keyword)
-             | Q(description__icontains=keyword)
-             | Q(company_name__icontains=keyword)
-             | Q(skills__icontains=keyword)
+@login_required
+@require_POST
+def bulk_decide(request: HttpRequest, advert_id: int):
+    job_advert: JobAdvert = get_object_or_404(
+        JobAdvert.objects.only("id", "title", "company_name", "created_by_id"), pk=advert_id
+    )
+    if request.user.pk != job_advert.created_by_id:
+        return HttpResponseForbidden("You do not have permission to change the status of these applications.")
+
+    form = BulkDecisionForm(request.POST)
+    if not form.is_valid():
+        messages.error(request, "Select at least one application and a decision.")
+        return redirect('advert_applications', advert_id=job_advert.id)
+
+    status = form.cleaned_data["status"]
+    # Only undecided applications can be changed, as on the single decide form
+    pending = job_advert.applications.filter(
+        id__in=form.cleaned_data["application_ids"], status=ApplicationStatus.APPLIED
+    )
+
+    with transaction.atomic():
+        # Lock the rows first, so the people notified are exactly those whose applications change
+        locked = list(pending.select_for_update().values_list("id", "email", "name"))
+        updated = JobApplication.objects.filter(id__in=[pk for pk, _, _ in locked]).update(
+            status=status, updated_at=timezone.now()
         )
+    rejected = [(email, name) for _, email, name in locked] if status == ApplicationStatus.REJECTED else []
+
+    if rejected:
+        send_bulk_notification.delay_on_commit(
+            f"Application outcome for {job_advert.title}",
+            "emails/job_application_update.html",
+            [
+                (email, {
+                    "applicant_name": name,
+                    "job_title": job_advert.title,
+                    "company_name": job_advert.company_name,
+                })
+                for email, name in rejected
+            ],
+        )
+
+    messages.success(request, f"{updated} applications updated to {status}.")
+    return redirect('advert_applications', advert_id=job_advert.id)
+
 
-    if location:
-        query &= Q(location__icontains=location)
 
-    active_adverts = JobAdvert.objects.filter(is_published=True, deadline__gte=timezone.now().date())
+@query_budget(6)
+async def search(request: HttpRequest):
+    # As on the home page, results are only shown to signed-in users
+    user = await _load_user(request)
+    if not user.is_authenticated:
+        return render(request, "home.html")
 
-    result = active_adverts.filter(query)
-    paginator = Paginator(result, 10)  # Show 10 adverts per page
-    requested_page = request.GET.get('page')
-    paginated_adverts = paginator.get_page(requested_page)
+    result, ordering = filter_adverts(JobAdvert.objects.all(), request.GET)
+    paginator = CursorPaginator(result, 10, ordering)  # Show 10 adverts per page
+    requested_cursor = request.GET.get('cursor')
+    paginated_adverts = await paginator.aget_page(requested_cursor)
+    await paginator.acount()
 
     context = {
-        "job_adverts": paginated_adverts,
+        "advert_list": render_to_string("advert_list.html", {
+            "job_adverts": paginated_adverts,
+            "search_query": search_query(request.GET),
+        }, request),
     }
     return render(request, "home.html", context)
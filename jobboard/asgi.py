@@ -13,4 +13,10 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jobboard.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402 (settings are ready once the application is)
+
+from common.asgi import BodySizeLimit  # noqa: E402
+
+application = BodySizeLimit(django_application, settings.REQUEST_MAX_BODY_SIZE)
@@ -0,0 +1,41 @@
+"""
+Celery application for the jobboard project.
+
+Start a worker with ``celery -A jobboard worker -l info``.
+"""
+
+import os
+
+from celery import Celery
+from celery.signals import worker_init, worker_process_shutdown
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jobboard.settings")
+
+app = Celery("jobboard")
+
+# Read every CELERY_* setting from Django's settings module.
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
+
+
+@worker_init.connect
+def serve_metrics(**kwargs):
+    """
+    Serve the metrics of the worker's pool processes, which /metrics on the web never sees.
+    """
+    from django.conf import settings
+    from prometheus_client import start_http_server
+
+    from common.metrics import metrics_registry, reset_multiprocess_dir
+
+    reset_multiprocess_dir()
+    if settings.METRICS_WORKER_PORT:
+        start_http_server(settings.METRICS_WORKER_PORT, settings.METRICS_WORKER_ADDRESS, metrics_registry())
+
+
+@worker_process_shutdown.connect
+def mark_metrics_process_dead(pid=None, **kwargs):
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid)
@@ -49,9 +49,14 @@ INSTALLED_APPS = [
 
 AUTH_USER_MODEL = "accounts.User"
 
+# ModelBackend, checking passwords for the async sign-in view on the hashing pool
+AUTHENTICATION_BACKENDS = ["accounts.hashing.HashingPoolBackend"]
+
 LOGIN_URL = "/auth/login/"
 
 MIDDLEWARE = [
+    "common.metrics.PrometheusMiddleware",
+    "common.querybudget.QueryBudgetMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -65,7 +70,7 @@ ROOT_URLCONF = "jobboard.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "common.metrics.InstrumentedDjangoTemplates",
         "DIRS": [os.path.join(BASE_DIR, "templates")],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -135,6 +140,53 @@ STATIC_ROOT = os.path.join(BASE_DIR, "static")
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# Bearer token required to read /metrics; leave unset to serve metrics openly
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+# Where each Celery worker serves its own metrics for Prometheus to scrape; port 0 turns it off
+METRICS_WORKER_PORT = int(os.environ.get("METRICS_WORKER_PORT", "9808"))
+METRICS_WORKER_ADDRESS = os.environ.get("METRICS_WORKER_ADDRESS", "127.0.0.1")
+
+# Raise instead of logging when a request breaks its view's query budget (on in tests)
+QUERY_BUDGET_STRICT = False
+# Running the same query shape this many times in one request is reported as an N+1
+QUERY_REPEAT_THRESHOLD = 5
+
+# Token buckets throttling login, sign-up and password reset attempts before any
+# password is hashed: (burst size, tokens refilled per second), per client address
+# and per email. Logins and resets only count failed attempts against the email.
+AUTH_RATE_LIMIT_PER_IP = (20, 20 / 60)
+AUTH_RATE_LIMIT_PER_EMAIL = (5, 5 / 300)
+# Threads hashing passwords for the async auth views, capping the cores a burst can take
+PASSWORD_HASHING_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+
+# Largest resume accepted by the apply form, in bytes
+RESUME_MAX_UPLOAD_SIZE = 5 * 1024 * 1024
+
+# Seconds before a resume file or reference left by an upload that never became an
+# application is collected; longer than any transaction saving an application runs.
+RESUME_BLOB_GRACE_PERIOD = 24 * 60 * 60
+
+# Largest request body the ASGI server reads at all: a resume plus the rest of the form
+REQUEST_MAX_BODY_SIZE = RESUME_MAX_UPLOAD_SIZE + 1024 * 1024
+
+# One cache shared by every web and worker process, so invalidations, ETag versions
+# and rate limits hold across all of them rather than per process.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get("CACHE_URL", "redis://localhost:6379/1"),
+    }
+}
+
+# Result counts shown next to paginated lists are cached for this many seconds,
+# and above the threshold the database planner's row estimate is shown instead.
+PAGINATION_COUNT_CACHE_TIMEOUT = 60
+PAGINATION_COUNT_ESTIMATE_THRESHOLD = 10_000
+
+# Rendered pages of the home page advert list are cached for this many seconds;
+# saving or deleting any advert invalidates them straight away.
+ADVERT_LIST_CACHE_TIMEOUT = 300
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -156,5 +208,25 @@ CELERY_ACCEPT_CONTENT = ["application/json"]
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TASK_SERIALIZER = "json"
 
-CELERY_BROKER_URL = "redis://localhost:6379/0"
-CELERY_RESULT_BACKEND = "redis://localhost:6379/0"
\ No newline at end of file
+CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", "redis://localhost:6379/0")
+CELERY_RESULT_BACKEND = os.environ.get("CELERY_RESULT_BACKEND", "redis://localhost:6379/0")
+
+# The common package is not an installed app, so list its task module explicitly.
+CELERY_IMPORTS = ("common.tasks",)
+
+# Run tasks inline instead of sending them to the broker (tests, local runs without redis).
+CELERY_TASK_ALWAYS_EAGER = os.environ.get("CELERY_TASK_ALWAYS_EAGER", "False") == "True"
+CELERY_TASK_EAGER_PROPAGATES = CELERY_TASK_ALWAYS_EAGER
+CELERY_TASK_ACKS_LATE = True
+
+# Periodic tasks, run by ``celery -A jobboard beat``.
+CELERY_BEAT_SCHEDULE = {
+    "purge-expired-pending-users-and-tokens": {
+        "task": "accounts.tasks.purge_expired_rows",
+        "schedule": 10 * 60,
+    },
+    "collect-resume-blobs": {
+        "task": "job_application.tasks.collect_resume_blobs",
+        "schedule": 60 * 60,
+    },
+}
@@ -20,10 +20,13 @@ from django.conf import settings
 from django.urls import path, include
 from django.conf.urls.static import static
 from job_application.views import list_adverts
+from common.metrics import metrics_view
 
 urlpatterns = [
     path("", list_adverts, name="home"),
     path("admin/", admin.site.urls),
     path("auth/", include("accounts.urls")),
     path("adverts/", include("job_application.urls")),
+    path("api/v1/", include("job_application.api_urls")),
+    path("metrics", metrics_view, name="metrics"),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)